@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Dorker - Dork compiler check
+#
+# Compiles known queries for every engine and compares the result with the
+# expected dialect, so rewriting operators never reorders a query or breaks its
+# OR / | / parenthesised structure. Also checks which spellings share a result
+# cache entry: reordered operators should, boolean queries with different
+# structure must not. Finally checks which result URLs deduplicate as the same
+# page.
+#
+#   python bench/dork_check.py
+#
+# Exits with status 1 when any case does not behave as expected.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dorker  # noqa: E402
+
+# (query, engine, expected compiled query; None means the engine must reject it)
+COMPILE_CASES = [
+    ("inurl:admin OR inurl:login", "Google", "inurl:admin OR inurl:login"),
+    ("inurl:admin OR inurl:login", "Bing", "inurl:admin OR inurl:login"),
+    ("site:x.com (inurl:admin | inurl:login) intitle:foo", "Google",
+     "site:x.com (inurl:admin | inurl:login) intitle:foo"),
+    ("site:x.com (inurl:admin | inurl:login) intitle:foo", "DuckDuckGo",
+     "site:x.com (inurl:admin | inurl:login) intitle:foo"),
+    ("(intext:password OR intext:passwd) ext:TXT", "Google", "(intext:password OR intext:passwd) filetype:txt"),
+    ("(intext:password OR intext:passwd) ext:TXT", "Bing", "(inbody:password OR inbody:passwd) filetype:txt"),
+    ("(intext:password OR -intext:\"pass word\") ext:pdf", "DuckDuckGo", "(password OR -\"pass word\") filetype:pdf"),
+    ("intext:password filetype:txt", "DuckDuckGo", None),
+    ("intitle:\"index of\" backup", "Bing", "intitle:\"index of\" backup"),
+]
+
+# (query, query, whether both must map to the same cache key)
+KEY_CASES = [
+    ("intext:password ext:TXT site:example.com", "site:Example.com filetype:txt intext:password", True),
+    ("inurl:admin  intitle:login", "intitle:login inurl:admin", True),
+    ("intitle:a OR intitle:b inurl:c", "intitle:a intitle:b OR inurl:c", False),
+    ("inurl:admin OR inurl:login", "OR inurl:admin inurl:login", False),
+    ("(inurl:admin | inurl:login) intitle:foo", "(inurl:admin | intitle:foo inurl:login)", False),
+    ("(ext:PDF | inurl:x) y", "(filetype:pdf | inurl:x) y", True),
+]
+
+# (url, url, whether both are the same page once tracking parameters are dropped)
+DEDUP_CASES = [
+    ("https://x.com/a?utm_source=tw&id=1", "http://www.x.com/a/?id=1", True),
+    ("https://x.com/a?id=1&fbclid=abc&gclid=def", "https://x.com/a?id=1&msclkid=ghi", True),
+    ("https://x.com/a?ref=home", "https://x.com/a", True),
+    ("https://x.com/a?reference=1", "https://x.com/a?reference=2", False),
+    ("https://x.com/a?refresh=1", "https://x.com/a", False),
+    ("https://x.com/a?refid=7", "https://x.com/a?refid=8", False),
+    ("https://x.com/a?fbclid_page=1", "https://x.com/a", False),
+    ("http://host:abc/", "http://host:abc/", True),
+]
+
+def check_compile():
+    """Return a list of failure messages for COMPILE_CASES."""
+    failures = []
+    for query, engine, expected in COMPILE_CASES:
+        try:
+            compiled = dorker.compile_query(query, engine)
+        except dorker.UnsupportedQuery:
+            compiled = None
+        if compiled != expected:
+            failures.append(f"{engine}: {query!r} compiled to {compiled!r}, expected {expected!r}")
+    return failures
+
+def check_keys():
+    """Return a list of failure messages for KEY_CASES."""
+    failures = []
+    for first, second, shared in KEY_CASES:
+        keys = (dorker.ResultCache.make_key("Google", first), dorker.ResultCache.make_key("Google", second))
+        if (keys[0] == keys[1]) != shared:
+            relation = "should" if shared else "must not"
+            failures.append(f"{first!r} and {second!r} {relation} share a cache key: {keys[0]!r} / {keys[1]!r}")
+    return failures
+
+def check_dedup():
+    """Return a list of failure messages for DEDUP_CASES."""
+    failures = []
+    for first, second, same in DEDUP_CASES:
+        keys = (dorker.canonicalize_url(first), dorker.canonicalize_url(second))
+        if (keys[0] == keys[1]) != same:
+            relation = "should" if same else "must not"
+            failures.append(f"{first!r} and {second!r} {relation} deduplicate: {keys[0]!r} / {keys[1]!r}")
+    return failures
+
+def main():
+    failed = False
+    checks = (
+        ("compile", COMPILE_CASES, check_compile),
+        ("cache key", KEY_CASES, check_keys),
+        ("dedup", DEDUP_CASES, check_dedup)
+    )
+    for name, cases, check in checks:
+        failures = check()
+        print(f"{name}: {len(cases) - len(failures)}/{len(cases)} cases as expected")
+        for message in failures:
+            print(f"- {message}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# Dorker - Local fake Bot API
+#
+# A small stand-in for the Telegram Bot API that records every call the bot
+# makes and answers with plausible results, so the bot can be driven end to end
+# without network access. Run directly to check update intake:
+#
+#   python bench/fake_bot_api.py                   # webhook mode
+#   python bench/fake_bot_api.py --mode polling    # long polling, for comparison
+#   python bench/fake_bot_api.py --users 20        # more concurrent chats
+#
+# Exits with status 1 when any command goes unanswered.
+
+import argparse
+import json
+import os
+import queue
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BOT_TOKEN = "123456:FAKE-TOKEN"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Dorker", "username": "dorker_test_bot"}
+
+# Methods whose result is the message that was sent or edited
+MESSAGE_METHODS = {"sendMessage", "editMessageText", "editMessageReplyMarkup", "sendDocument"}
+
+def free_port():
+    """Return a local TCP port that is currently unused."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def command_update(update_id, chat_id, text, user_id=None):
+    """Build a private-chat message update, marking a leading /command as a bot command."""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private"},
+        "from": {"id": user_id or chat_id, "is_bot": False, "first_name": f"user{chat_id}"},
+        "text": text
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+class FakeBotAPIHandler(BaseHTTPRequestHandler):
+    """Answer /bot<token>/<method> requests."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        params = self.parse_params(body)
+        result = self.server.api.handle(method, params)
+        payload = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST
+
+    def parse_params(self, body):
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return json.loads(body or b"{}")
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            return {k: v[0] for k, v in parse_qs(body.decode()).items()}
+        # Multipart uploads (documents) are recorded without their fields
+        return {}
+
+class FakeBotAPI:
+    """Records Bot API calls and serves queued updates to getUpdates."""
+
+    def __init__(self):
+        self.calls = []
+        self.updates = queue.Queue()
+        self._message_id = 0
+        self._cond = threading.Condition()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBotAPIHandler)
+        self.server.api = self
+
+    @property
+    def base_url(self):
+        """The base_url to hand to the Updater."""
+        return f"http://127.0.0.1:{self.server.server_address[1]}/bot"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def push_update(self, update):
+        """Queue an update for the next getUpdates call."""
+        self.updates.put(update)
+
+    def handle(self, method, params):
+        with self._cond:
+            self.calls.append((time.perf_counter(), method, params))
+            self._cond.notify_all()
+            if method in MESSAGE_METHODS:
+                self._message_id += 1
+                message_id = self._message_id
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return self.next_updates(float(params.get("timeout", 0) or 0))
+        if method in MESSAGE_METHODS:
+            return {
+                "message_id": int(params.get("message_id", message_id)),
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", "")
+            }
+        return True
+
+    def next_updates(self, timeout):
+        """Long-poll for queued updates, returning early once one arrives."""
+        batch = []
+        try:
+            batch.append(self.updates.get(timeout=min(timeout, 1.0)))
+            while True:
+                batch.append(self.updates.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def count_calls(self, predicate):
+        """Return how many recorded calls match predicate(method, params)."""
+        with self._cond:
+            return sum(1 for _, method, params in self.calls if predicate(method, params))
+
+    def wait_for(self, predicate, count=1, timeout=10):
+        """Block until `count` recorded calls match predicate(method, params); returns the last one's timestamp or None."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                matches = [stamp for stamp, method, params in self.calls if predicate(method, params)]
+                if len(matches) >= count:
+                    return matches[count - 1]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+def post_update(url, update):
+    """Deliver an update to a webhook receiver; returns the acknowledgement time in seconds."""
+    request = urllib.request.Request(
+        url, data=json.dumps(update).encode(), headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the bot end to end against a fake Bot API.")
+    parser.add_argument("--mode", choices=["webhook", "polling"], default="webhook", help="update intake mode")
+    parser.add_argument("--users", type=int, default=8, help="concurrent chats sending commands")
+    parser.add_argument("--commands", default="/start,/help,/whoami,/status", help="comma-separated commands per chat")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds to wait for each reply")
+    args = parser.parse_args()
+
+    import dorker
+
+    api = FakeBotAPI().start()
+    dorker.watch_store = dorker.WatchStore(os.path.join(tempfile.mkdtemp(), "watches.db"))
+    dorker.WEBHOOK_LISTEN = "127.0.0.1"
+    dorker.WEBHOOK_PORT = free_port()
+    dorker.WEBHOOK_PATH = "hook"
+    dorker.WEBHOOK_URL = f"http://127.0.0.1:{dorker.WEBHOOK_PORT}/{dorker.WEBHOOK_PATH}"
+    updater = dorker.build_updater(token=BOT_TOKEN, base_url=api.base_url)
+    dorker.start_intake(updater, args.mode)
+    webhook_url = dorker.WEBHOOK_URL
+
+    commands = [c for c in args.commands.split(",") if c]
+    acks, latencies, missing = [], [], []
+    lock = threading.Lock()
+
+    def run_chat(chat_id):
+        def is_reply(method, params):
+            return method == "sendMessage" and int(params.get("chat_id", 0)) == chat_id
+
+        for n, text in enumerate(commands):
+            update_id = chat_id * 1000 + n
+            update = command_update(update_id, chat_id, text)
+            # Commands may answer with several messages (admin /status does), so wait for the
+            # first one after those already sent rather than for a fixed running count
+            before = api.count_calls(is_reply)
+            sent = time.perf_counter()
+            if args.mode == "webhook":
+                ack = post_update(webhook_url, update)
+                with lock:
+                    acks.append(ack)
+            else:
+                api.push_update(update)
+            replied = api.wait_for(is_reply, count=before + 1, timeout=args.timeout)
+            with lock:
+                if replied is None:
+                    missing.append(f"{chat_id}:{text}")
+                else:
+                    latencies.append(replied - sent)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            list(pool.map(run_chat, range(1, args.users + 1)))
+    finally:
+        updater.stop()
+        api.stop()
+
+    print(f"mode: {args.mode}, chats: {args.users}, commands: {len(commands) * args.users}")
+    if acks:
+        print(f"webhook ack: median {statistics.median(acks) * 1000:.1f} ms, max {max(acks) * 1000:.1f} ms")
+    if latencies:
+        print(
+            f"command to reply: median {statistics.median(latencies) * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms"
+        )
+    if missing:
+        print(f"No reply for: {', '.join(missing)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Dorker - Import-time budget check
+#
+# Imports dorker.py in fresh interpreters and fails when the median import takes
+# longer than the budget, or when a heavy dependency is loaded at import time
+# instead of on first use.
+#
+#   python bench/import_time.py                 # default 0.3 s budget
+#   python bench/import_time.py --budget 0.5 --runs 10
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported when the code that needs them runs
+LAZY_MODULES = ["selenium", "telegram", "bs4", "lxml", "aiohttp", "fake_useragent", "requests", "redis"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import dorker
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(m for m in sys.modules if "." not in m)}))
+"""
+
+def measure_import():
+    """Import dorker in a fresh interpreter; returns (seconds, top-level modules loaded)."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    data = json.loads(output.strip().splitlines()[-1])
+    return data["seconds"], set(data["modules"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Check how long importing dorker.py takes.")
+    parser.add_argument("--budget", type=float, default=0.3, help="maximum median import time in seconds")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure")
+    args = parser.parse_args()
+
+    timings = []
+    loaded = set()
+    for _ in range(args.runs):
+        seconds, modules = measure_import()
+        timings.append(seconds)
+        loaded |= modules
+
+    median = statistics.median(timings)
+    print(f"import dorker: median {median * 1000:.1f} ms over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"Loaded at import time (should be lazy): {', '.join(eager)}")
+        failed = True
+    if median > args.budget:
+        print("Import time is over budget.")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
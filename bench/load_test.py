@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# Dorker - End-to-end load test
+#
+# Drives the handlers registered by build_updater() with synthetic users talking
+# to the local fake Bot API, while the search engines are replaced by a local
+# server that serves the saved result pages in bench/fixtures with injected
+# latency and failures. Users are added in stages and every /dork is timed from
+# the moment its update is delivered until the results (or the reason there are
+# none) arrive.
+#
+#   python bench/load_test.py                                  # 1, 5, 10, 20 users
+#   python bench/load_test.py --stages 10,50,100 --stage-seconds 30
+#   python bench/load_test.py --latency 800 --fail-rate 0.1 --fail-mode empty
+#   python bench/load_test.py --p99-budget 5                   # fail when the last stage is slower
+#
+# Lane sizes and engine concurrency come from the usual environment variables
+# (SEARCH_WORKERS, SEARCH_QUEUE_SIZE, ENGINE_CONCURRENCY, BOT_WORKERS, ...), so
+# the numbers reflect the configuration being released. Memory is the RSS of
+# this process, which also holds the fake servers.
+#
+# Exits with status 1 when a command goes unanswered or the p99 budget is exceeded.
+
+import argparse
+import collections
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import dorker  # noqa: E402
+from fake_bot_api import BOT_TOKEN, FakeBotAPI, command_update, free_port, post_update  # noqa: E402
+from serp_bench import FIXTURES_DIR, load_fixtures  # noqa: E402
+
+# How the reply that ends a /dork starts, mapped to the outcome it is counted as
+OUTCOMES = [
+    ("Results for:", "results"),
+    ("No results found", "empty"),
+    ("The search queue is full", "rejected"),
+    ("Rate limit exceeded", "rejected"),
+]
+
+QUERY_WORDS = ["admin", "login", "backup", "config", "password", "index of", "database", "upload", "report"]
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+class FakeEngineHandler(BaseHTTPRequestHandler):
+    """Answer /<engine>/... with a saved result page after the configured delay."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        engine = self.path.lstrip("/").split("/", 1)[0]
+        pages = server.pages.get(engine)
+        with server.lock:
+            server.requests[engine] += 1
+            delay = max(0.0, random.gauss(server.latency, server.latency * server.jitter))
+            failing = random.random() < server.fail_rate
+            page = random.choice(pages) if pages else b""
+        if failing:
+            server.failures[engine] += 1
+            if server.fail_mode == "hang":
+                # Longer than any search timeout, so the client gives up first
+                time.sleep(dorker.SEARCH_TIMEOUT_MAX + 5)
+                return
+            time.sleep(delay)
+            if server.fail_mode == "503":
+                self.send_error(503)
+                return
+            page = b"<html><body>No results</body></html>"
+        else:
+            time.sleep(delay)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class FakeEngines:
+    """Local stand-ins for every entry in SEARCH_ENGINES."""
+
+    def __init__(self, latency, jitter, fail_rate, fail_mode, fixtures_dir=FIXTURES_DIR):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEngineHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.jitter = jitter
+        self.server.fail_rate = fail_rate
+        self.server.fail_mode = fail_mode
+        self.server.lock = threading.Lock()
+        self.server.requests = collections.Counter()
+        self.server.failures = collections.Counter()
+        self.server.pages = collections.defaultdict(list)
+        for engine, _, html in load_fixtures(fixtures_dir):
+            self.server.pages[engine.lower()].append(html.encode("utf-8"))
+        self._urls = {}
+
+    def start(self):
+        """Serve in the background and point SEARCH_ENGINES at this server."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        for engine in dorker.SEARCH_ENGINES:
+            self._urls[engine["name"]] = engine["url"]
+            engine["url"] = f"{base}/{engine['name'].lower()}/search?q={{query}}"
+        return self
+
+    def stop(self):
+        for engine in dorker.SEARCH_ENGINES:
+            engine["url"] = self._urls.get(engine["name"], engine["url"])
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        return dict(self.server.requests), dict(self.server.failures)
+
+class LoadBotAPI(FakeBotAPI):
+    """Fake Bot API that also routes every sent message to a per-chat inbox."""
+
+    def __init__(self):
+        super().__init__()
+        self.inboxes = collections.defaultdict(collections.deque)
+        self._inbox_cond = threading.Condition()
+
+    def handle(self, method, params):
+        result = super().handle(method, params)
+        if method in ("sendMessage", "editMessageText"):
+            with self._inbox_cond:
+                self.inboxes[int(params.get("chat_id", 0))].append((time.perf_counter(), params.get("text", "")))
+                self._inbox_cond.notify_all()
+        return result
+
+    def next_message(self, chat_id, timeout):
+        """Pop the next message sent to chat_id as (timestamp, text), or None on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._inbox_cond:
+            inbox = self.inboxes[chat_id]
+            while not inbox:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._inbox_cond.wait(remaining)
+            return inbox.popleft()
+
+def engine_counts():
+    """Return (circuit skips, non-200 engine responses) so far."""
+    return (
+        sum(dorker.metrics.counters("dorker_circuit_skips_total").values()),
+        sum(dorker.metrics.counters("dorker_http_status_total").values())
+    )
+
+class LoadTest:
+    """Ramp synthetic users up in stages and record every command they send."""
+
+    def __init__(self, api, deliver, args):
+        self.api = api
+        self.deliver = deliver
+        self.args = args
+        self.stage = 0
+        self.records = []  # (stage, seconds, outcome, whether the Selenium fallback ran)
+        self.missing = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._update_id = 0
+
+    def next_update_id(self):
+        with self._lock:
+            self._update_id += 1
+            return self._update_id
+
+    def send(self, chat_id, text):
+        update = command_update(self.next_update_id(), chat_id, text)
+        sent = time.perf_counter()
+        self.deliver(update)
+        return sent
+
+    def wait_reply(self, chat_id, sent):
+        """Read replies until one ends the command; returns (seconds, outcome, fell_back)."""
+        fell_back = False
+        while True:
+            message = self.api.next_message(chat_id, self.args.timeout)
+            if message is None:
+                return None, "timeout", fell_back
+            stamp, text = message
+            if text.startswith("First method failed"):
+                fell_back = True
+                continue
+            for prefix, outcome in OUTCOMES:
+                if text.startswith(prefix):
+                    return stamp - sent, outcome, fell_back
+            if not text.startswith("Searching for:"):
+                return stamp - sent, "error", fell_back
+
+    def run_user(self, chat_id, engine):
+        # Pick the engine first; its reply is not part of the measurements
+        self.send(chat_id, f"/engine {engine}")
+        self.api.next_message(chat_id, self.args.timeout)
+
+        n = 0
+        while not self._stop.is_set():
+            n += 1
+            # Unique queries so every command reaches the engines instead of the result cache
+            query = f"{random.choice(QUERY_WORDS)} u{chat_id}n{n}"
+            stage = self.stage
+            sent = self.send(chat_id, f"/dork {query}")
+            seconds, outcome, fell_back = self.wait_reply(chat_id, sent)
+            with self._lock:
+                if seconds is None:
+                    self.missing.append(f"{chat_id}:{query}")
+                else:
+                    self.records.append((stage, seconds, outcome, fell_back))
+            self._stop.wait(random.uniform(0.5, 1.5) * self.args.think)
+
+    def run(self, stages):
+        """Run every stage; returns one summary dict per stage."""
+        engines = [name.strip() for name in self.args.engines.split(",") if name.strip()]
+        threads = []
+        windows = []
+        rss_start = rss_bytes()
+        counts = engine_counts()
+        for index, users in enumerate(stages):
+            self.stage = index
+            started = time.perf_counter()
+            while len(threads) < users:
+                chat_id = len(threads) + 1
+                thread = threading.Thread(
+                    target=self.run_user, args=(chat_id, engines[chat_id % len(engines)]), daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+            print(f"stage {index + 1}/{len(stages)}: {users} users for {self.args.stage_seconds:.0f} s", file=sys.stderr)
+            time.sleep(self.args.stage_seconds)
+            elapsed = time.perf_counter() - started
+            if index == len(stages) - 1:
+                # Let in-flight commands finish so none are reported missing by mistake
+                self._stop.set()
+                for thread in threads:
+                    thread.join(self.args.timeout * 2)
+            previous, counts = counts, engine_counts()
+            windows.append((users, elapsed, previous, counts, rss_bytes()))
+
+        # Commands are summarized once all of them have finished, in the stage they were sent in
+        return [self.summarize(index, *window, rss_start) for index, window in enumerate(windows)]
+
+    def summarize(self, index, users, elapsed, counts_before, counts_after, rss, rss_start):
+        with self._lock:
+            records = [r for r in self.records if r[0] == index]
+        latencies = sorted(seconds for _, seconds, outcome, _ in records if outcome in ("results", "empty"))
+        outcomes = collections.Counter(outcome for _, _, outcome, _ in records)
+        fallbacks = sum(1 for _, _, outcome, fell_back in records if fell_back and outcome != "rejected")
+        skips, http_errors = (after - before for after, before in zip(counts_after, counts_before))
+        return {
+            "users": users,
+            "commands": len(records),
+            "throughput": len(latencies) / elapsed,
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+            "results": outcomes["results"],
+            "empty": outcomes["empty"],
+            "rejected": outcomes["rejected"],
+            "errors": outcomes["error"],
+            "fallback_rate": fallbacks / len(latencies) if latencies else 0.0,
+            "circuit_skips": skips,
+            "http_errors": http_errors,
+            "rss_mib": rss / 2 ** 20,
+            "rss_growth_mib": (rss - rss_start) / 2 ** 20
+        }
+
+    @staticmethod
+    def header():
+        return (
+            f"{'users':>5} {'cmds':>6} {'cmd/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'empty':>6} "
+            f"{'reject':>6} {'errors':>6} {'non-200':>7} {'fallback':>8} {'skips':>6} {'RSS MiB':>8} {'growth':>7}"
+        )
+
+    @staticmethod
+    def format_row(s):
+        return (
+            f"{s['users']:>5} {s['commands']:>6} {s['throughput']:>7.2f} {s['p50'] * 1000:>8.0f} "
+            f"{s['p99'] * 1000:>8.0f} {s['empty']:>6} {s['rejected']:>6} {s['errors']:>6} {s['http_errors']:>7} "
+            f"{s['fallback_rate']:>8.1%} {s['circuit_skips']:>6} {s['rss_mib']:>8.1f} {s['rss_growth_mib']:>+7.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the bot end to end against fake Telegram and fake engines.")
+    parser.add_argument("--stages", default="1,5,10,20", help="comma-separated concurrent users per stage")
+    parser.add_argument("--stage-seconds", type=float, default=15, help="how long each stage runs")
+    parser.add_argument("--think", type=float, default=1.0, help="average pause between a reply and the next command")
+    parser.add_argument("--engines", default="Google,Bing,DuckDuckGo", help="engines assigned to users round robin")
+    parser.add_argument("--latency", type=float, default=300, help="median engine response time in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0.3, help="standard deviation of the latency, as a fraction of it")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of engine requests that fail")
+    parser.add_argument("--fail-mode", choices=["503", "empty", "hang"], default="503",
+                        help="how failing requests fail: an error status, a page without results, or no answer")
+    parser.add_argument("--mode", choices=["webhook", "polling"], default="webhook", help="update intake mode")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for a command to finish")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    parser.add_argument("--p99-budget", type=float, help="fail when the last stage's p99 exceeds this many seconds")
+    args = parser.parse_args()
+
+    stages = [int(n) for n in args.stages.split(",") if n]
+    for engine in args.engines.split(","):
+        dorker.get_engine(engine.strip())
+
+    # Everyone may /dork, and the per-user hourly cap is lifted so the ramp measures
+    # the queues and engines rather than the rate limiter
+    tmp = tempfile.mkdtemp()
+    dorker.ADMIN_ID = 0
+    dorker.rate_limiter = dorker.RateLimiter(limit=10 ** 9, db_path=os.path.join(tmp, "rate_limit.db"))
+    dorker.watch_store = dorker.WatchStore(os.path.join(tmp, "watches.db"))
+    dorker.WEBHOOK_LISTEN = "127.0.0.1"
+    dorker.WEBHOOK_PORT = free_port()
+    dorker.WEBHOOK_PATH = "hook"
+    dorker.WEBHOOK_URL = f"http://127.0.0.1:{dorker.WEBHOOK_PORT}/{dorker.WEBHOOK_PATH}"
+    if not args.verbose:
+        # Injected failures would otherwise bury the table in search error logs
+        logging.disable(logging.ERROR)
+
+    engines = FakeEngines(args.latency / 1000, args.jitter, args.fail_rate, args.fail_mode).start()
+    api = LoadBotAPI().start()
+    dorker.user_lane.start()
+    dorker.admin_lane.start()
+    updater = dorker.build_updater(token=BOT_TOKEN, base_url=api.base_url)
+    dorker.start_intake(updater, args.mode)
+    webhook_url = dorker.WEBHOOK_URL
+    deliver = (lambda update: post_update(webhook_url, update)) if args.mode == "webhook" else api.push_update
+
+    print(
+        f"mode: {args.mode}, engine latency {args.latency:.0f} ms, fail rate {args.fail_rate:.0%} ({args.fail_mode}), "
+        f"search workers {dorker.SEARCH_WORKERS}, queue {dorker.SEARCH_QUEUE_SIZE}, "
+        f"engine concurrency {dorker.ENGINE_CONCURRENCY}\n"
+    )
+    test = LoadTest(api, deliver, args)
+    try:
+        summaries = test.run(stages)
+    finally:
+        updater.stop()
+        dorker.user_lane.stop()
+        dorker.admin_lane.stop()
+        dorker.fanout_executor.shutdown(wait=False)
+        dorker.browser_pool.shutdown()
+        dorker.search_client.close()
+        dorker.async_core.close()
+        api.stop()
+        engines.stop()
+
+    print(LoadTest.header())
+    for summary in summaries:
+        print(LoadTest.format_row(summary))
+
+    requests_by_engine, failures_by_engine = engines.stats()
+    print("\nengine requests: " + ", ".join(
+        f"{name} {count} ({failures_by_engine.get(name, 0)} failed)" for name, count in sorted(requests_by_engine.items())
+    ))
+
+    failed = False
+    if test.missing:
+        print(f"No reply within {args.timeout:.0f} s for {len(test.missing)} command(s): {', '.join(test.missing[:10])}")
+        failed = True
+    if args.p99_budget is not None:
+        within = [s["users"] for s in summaries if s["commands"] and s["p99"] <= args.p99_budget]
+        print(f"Largest stage within the {args.p99_budget:.1f} s p99 budget: {max(within) if within else 0} users")
+        if summaries[-1]["p99"] > args.p99_budget:
+            print("The last stage is over the p99 budget.")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# Dorker - Offline SERP parser benchmark
+#
+# Times result extraction for every engine in SEARCH_ENGINES against the saved
+# result pages in bench/fixtures/<engine>/*.html, without touching the network.
+#
+#   python bench/serp_bench.py                     # parse-only benchmark
+#   python bench/serp_bench.py --http              # also time fetch+parse via a local stand-in server
+#   python bench/serp_bench.py --update-baseline   # record the current numbers as the baseline
+#
+# Every timed run of a page is paired with a plain parse of a reference page by
+# the same library right before it, and the gate compares the median ratio of
+# the two with the baseline's. Shared machines speed up and slow down for
+# seconds at a time, which moves both halves of a pair alike. Exits with status
+# 1 when a page's ratio is more than --threshold above the baseline's and the
+# page is more than --min-delta milliseconds slower, or when it extracts a
+# different number of results.
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dorker  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+def load_fixtures(fixtures_dir):
+    """Return [(engine_name, page_name, html)] for every saved result page."""
+    pages = []
+    for engine in dorker.SEARCH_ENGINES:
+        engine_dir = os.path.join(fixtures_dir, engine["name"].lower())
+        if not os.path.isdir(engine_dir):
+            print(f"warning: no fixtures for {engine['name']} in {engine_dir}")
+            continue
+        for filename in sorted(os.listdir(engine_dir)):
+            if filename.endswith(".html"):
+                with open(os.path.join(engine_dir, filename), encoding="utf-8") as f:
+                    pages.append((engine["name"], filename[:-5], f.read()))
+    return pages
+
+def backends():
+    """Return the extraction backends available in this environment."""
+    available = {"bs4": dorker._extract_with_bs4}
+    if dorker.LXML_AVAILABLE:
+        available["lxml"] = dorker._extract_with_lxml
+    return available
+
+def parse_with_bs4(html):
+    """Build a full BeautifulSoup tree and nothing else."""
+    from bs4 import BeautifulSoup
+    BeautifulSoup(html, 'html.parser')
+
+def parse_with_lxml(html):
+    """Build a full lxml tree and nothing else."""
+    from lxml import etree
+    etree.HTML(html.encode('utf-8'))
+
+def references(pages):
+    """Return {backend: func} parsing the largest fixture with the backend's library.
+
+    These never change with dorker's code, so they tell how fast the machine runs
+    each backend's kind of work at the moment they run.
+    """
+    largest = max((html for _, _, html in pages), key=len)
+    available = {"bs4": partial(parse_with_bs4, largest)}
+    if dorker.LXML_AVAILABLE:
+        available["lxml"] = partial(parse_with_lxml, largest)
+    return available
+
+def measure(cases, references, repeat, rounds):
+    """Time every (key, backend, func, page_bytes) case; return benchmark rows.
+
+    Each case gets an untimed warm-up call, then `rounds` passes over all cases run it
+    `repeat` times each, every run right after a run of its backend's reference parse.
+    A row's "seconds" is its fastest run and its "relative" the median ratio of a run
+    to the reference run before it.
+    """
+    timings = {key: [] for key, _, _, _ in cases}
+    ratios = {key: [] for key, _, _, _ in cases}
+    results = {}
+    for key, _, func, _ in cases:
+        results[key] = func()
+    for reference in references.values():
+        reference()
+    # Like timeit, keep the garbage collector out of the timed runs
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            for key, backend, func, _ in cases:
+                gc.collect()
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    references[backend]()
+                    middle = time.perf_counter()
+                    func()
+                    end = time.perf_counter()
+                    timings[key].append(end - middle)
+                    ratios[key].append((end - middle) / (middle - start))
+    finally:
+        gc.enable()
+
+    rows = []
+    for key, _, func, page_bytes in cases:
+        # Measure allocations in a separate run so tracing does not skew the timings
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows.append({
+            "key": key,
+            "seconds": min(timings[key]),
+            "relative": statistics.median(ratios[key]),
+            "peak_bytes": peak,
+            "results": len(results[key]),
+            "page_bytes": page_bytes
+        })
+    return rows
+
+def parser_cases(pages, limit):
+    """Return (key, backend, func, page_bytes) cases for every backend on every page."""
+    cases = []
+    for engine, page, html in pages:
+        spec = dorker.get_engine(engine)
+        for backend, extract in backends().items():
+            cases.append((
+                f"parse/{backend}/{engine.lower()}/{page}",
+                backend,
+                partial(extract, spec, html, limit),
+                len(html.encode("utf-8"))
+            ))
+    return cases
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serve fixture pages, ignoring the query string."""
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server(fixtures_dir):
+    """Serve the fixtures on a free local port; returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(FixtureHandler, directory=fixtures_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def http_cases(pages, server):
+    """Return cases timing the full search_with_requests path against the local stand-in server."""
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    dorker.USE_PROXIES = False
+    # search_with_requests goes through extract_results, which prefers lxml
+    backend = "lxml" if dorker.LXML_AVAILABLE else "bs4"
+
+    def fetch(engine, url):
+        dorker.get_engine(engine)["url"] = url
+        return dorker.search_with_requests("bench query", engine)
+
+    return [
+        (
+            f"http/{engine.lower()}/{page}",
+            backend,
+            partial(fetch, engine, f"{base}/{engine.lower()}/{page}.html?q={{query}}"),
+            len(html.encode("utf-8"))
+        )
+        for engine, page, html in pages
+    ]
+
+def compare(rows, baseline, threshold, min_delta):
+    """Return a list of regression messages against the baseline.
+
+    A page only counts as slower when its time relative to the reference parse exceeds
+    the baseline's by more than `threshold`, and the share of its time that increase
+    accounts for is more than `min_delta` seconds, so timer noise on sub-millisecond
+    pages is not reported.
+    """
+    regressions = []
+    for row in rows:
+        previous = baseline.get(row["key"])
+        if not previous:
+            continue
+        if row["results"] != previous["results"]:
+            regressions.append(
+                f"{row['key']}: extracted {row['results']} results, baseline {previous['results']}"
+            )
+        if "relative" not in previous:
+            continue
+        growth = row["relative"] / previous["relative"]
+        if growth > 1 + threshold and row["seconds"] * (1 - 1 / growth) > min_delta:
+            regressions.append(
+                f"{row['key']}: {row['relative']:.3f}x the reference parse, baseline {previous['relative']:.3f}x "
+                f"({row['seconds'] * 1000:.2f} ms, baseline {previous['seconds'] * 1000:.2f} ms)"
+            )
+    return regressions
+
+def print_table(rows, baseline):
+    print(f"{'benchmark':<42} {'ms':>9} {'base ms':>9} {'rel':>7} {'base rel':>9} {'peak KiB':>9} {'results':>8}")
+    for row in rows:
+        previous = baseline.get(row["key"]) or {}
+        base_ms = f"{previous['seconds'] * 1000:.2f}" if previous else "-"
+        base_rel = f"{previous['relative']:.3f}" if "relative" in previous else "-"
+        print(
+            f"{row['key']:<42} {row['seconds'] * 1000:>9.2f} {base_ms:>9} {row['relative']:>7.3f} {base_rel:>9} "
+            f"{row['peak_bytes'] / 1024:>9.1f} {row['results']:>8}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SERP extraction against saved result pages.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of <engine>/*.html pages")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per page in each round")
+    parser.add_argument("--rounds", type=int, default=20, help="interleaved passes over all pages")
+    parser.add_argument("--limit", type=int, default=dorker.DISPLAY_LIMIT, help="results to extract per page")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="milliseconds a page may slow down by regardless of --threshold")
+    parser.add_argument("--http", action="store_true", help="also time fetch+parse through a local server")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print("No fixtures found.")
+        return 1
+
+    cases = parser_cases(pages, args.limit)
+    server = None
+    original_urls = {e["name"]: e["url"] for e in dorker.SEARCH_ENGINES}
+    if args.http:
+        server = start_fixture_server(args.fixtures)
+        cases += http_cases(pages, server)
+    try:
+        rows = measure(cases, references(pages), args.repeat, args.rounds)
+    finally:
+        if server:
+            for engine in dorker.SEARCH_ENGINES:
+                engine["url"] = original_urls[engine["name"]]
+            server.shutdown()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_table(rows, baseline)
+
+    if args.update_baseline:
+        baseline.update({
+            row["key"]: {"seconds": row["seconds"], "relative": row["relative"], "results": row["results"]}
+            for row in rows
+        })
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(rows, baseline, args.threshold, args.min_delta / 1000)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"- {message}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,27 +2,83 @@
 #!/usr/bin/env python3
 # Dorker - Google Dork Search Tool (Python Version)
 
+from __future__ import annotations
+
 import os
 import time
 import logging
 import random
+import io
 import json
 import re
-from datetime import datetime, timedelta
+import hashlib
+import argparse
+import zlib
+import lzma
+import asyncio
+import csv
+import tempfile
+import queue
+import threading
+import functools
+import importlib
+import importlib.util
+import sqlite3
+import signal
+import sys
+import contextvars
+from collections import Counter, deque, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-ua = UserAgent()
-DEFAULT_USER_AGENT = ua.random if hasattr(ua, "random") else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from telegram import Update
-from telegram.ext import Updater, CommandHandler, CallbackContext
+
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import CallbackContext
+
+class LazyModule:
+    """Stand-in for a module that is only imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Heavy dependencies are loaded on first use so importing this module stays fast;
+# Selenium in particular is only loaded when the fallback actually runs.
+requests = LazyModule('requests')
+etree = LazyModule('lxml.etree')
+aiohttp = LazyModule('aiohttp')
+webdriver = LazyModule('selenium.webdriver')
+selenium_by = LazyModule('selenium.webdriver.common.by')
+selenium_ui = LazyModule('selenium.webdriver.support.ui')
+EC = LazyModule('selenium.webdriver.support.expected_conditions')
+redis = LazyModule('redis')
+
+# Optional dependencies, checked without importing them
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None  # Otherwise BeautifulSoup's pure-Python parser is used
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None  # Otherwise only the blocking requests client
+REDIS_AVAILABLE = importlib.util.find_spec('redis') is not None  # Needed for a redis:// shared store
+
+# Used when the fake-useragent data cannot be loaded
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+FALLBACK_USER_AGENTS = [
+    DEFAULT_USER_AGENT,
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.2; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0"
+]
 
 # Configure logging
 logging.basicConfig(
@@ -36,80 +92,861 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 ADMIN_ID = int(os.getenv('ADMIN_ID', 0))  # Default to 0 if not set
 
+# Update intake settings
+BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()  # 'polling' or 'webhook'
+BOT_WORKERS = int(os.getenv('BOT_WORKERS', 8))  # Threads running command handlers concurrently
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL') or None  # Bot API base URL, e.g. a local stand-in for testing
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '')  # Secret URL path; defaults to the bot token
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')  # Public URL Telegram posts to, e.g. https://bot.example.com/<path>
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', 40))  # Concurrent deliveries Telegram may open
+
+# Scale-out settings
+BOT_ROLE = os.getenv('BOT_ROLE', 'all').lower()  # 'all', 'intake' (receive updates, queue searches) or 'worker'
+SHARED_STORE = os.getenv('SHARED_STORE', '')  # sqlite:///path/shared.db (one host) or redis://host:6379/0; empty keeps state in-process
+SHARED_QUEUE_SIZE = int(os.getenv('SHARED_QUEUE_SIZE', 200))  # Searches waiting per shared lane before new ones are rejected
+
 # Rate limiting settings
 RATE_LIMIT = 5  # Maximum number of searches per hour
-rate_limit_data = {}
-rate_limit_file = "rate_limit.json"
+RATE_LIMIT_WINDOW = 3600  # Sliding window length in seconds
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', 'rate_limit.db')  # SQLite file (WAL mode) holding recent searches
+RATE_LIMIT_FLUSH_INTERVAL = int(os.getenv('RATE_LIMIT_FLUSH_INTERVAL', 30))  # Seconds between flushes/sweeps
+
+# Engine health settings
+HEALTH_EWMA_ALPHA = 0.2  # Weight of the newest sample in the latency/success averages
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))  # Consecutive failures before skipping a method
+CIRCUIT_OPEN_SECONDS = int(os.getenv('CIRCUIT_OPEN_SECONDS', 120))  # Seconds before a skipped method is probed again
+# Text that marks a result-less page as a captcha or block page rather than a dork with no hits
+BLOCK_PAGE_MARKERS = ("unusual traffic", "/sorry/", "captcha", "anomaly-modal", "automated queries")
+SEARCH_TIMEOUT_MIN = 3  # Seconds; lower bound for adaptive timeouts
+SEARCH_TIMEOUT_MAX = 15  # Seconds; used until enough latency samples exist
+SEARCH_TIMEOUT_PERCENTILE = 0.95  # Adaptive timeout = this percentile of recent successful latencies...
+SEARCH_TIMEOUT_FACTOR = 2  # ...times this factor
+
+# Metrics settings
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Serve Prometheus metrics on 127.0.0.1:<port> (0 disables)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)  # Seconds
+RESULT_BUCKETS = (0, 1, 5, 10, 20, 30)
+
+# Tracing and profiling settings
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', 200))  # Recent search traces kept for /traces
+PROFILE_INTERVAL = 0.005  # Seconds between profiler samples
+PROFILE_MAX_SECONDS = 600  # A profile stops after this long even if fewer searches ran
 
 # Proxy settings (optional)
 USE_PROXIES = False
 PROXIES = []  # Add your proxies here in format: ["http://user:pass@ip:port", ...]
 
+# HTTP client settings
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))  # Keep-alive connections kept per engine host
+# Only advertise brotli when urllib3 can decode it
+ACCEPT_ENCODING = 'gzip, deflate, br' if (
+    importlib.util.find_spec('brotli') or importlib.util.find_spec('brotlicffi')
+) else 'gzip, deflate'
+
+# Async search core settings (requires aiohttp)
+ASYNC_SEARCH = os.getenv('ASYNC_SEARCH', '1') == '1' and AIOHTTP_AVAILABLE  # Route HTTP searches through the event loop
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 100))  # Open connections across all engines
+
+# Browser pool settings (Selenium fallback)
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))  # Maximum number of warm Chrome instances
+BROWSER_MAX_USES = int(os.getenv('BROWSER_MAX_USES', 25))  # Recycle a browser after this many searches
+BROWSER_LEASE_TIMEOUT = int(os.getenv('BROWSER_LEASE_TIMEOUT', 60))  # Seconds to wait for a free browser
+BROWSER_LIGHT_PROFILE = os.getenv('BROWSER_LIGHT_PROFILE', '1') == '1'  # Skip images, fonts and CSS when loading pages
+# Resources blocked by the light profile; result extraction only needs the DOM
+BROWSER_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css"
+]
+
+# Hedged fallback settings
+HEDGE_SELENIUM = os.getenv('HEDGE_SELENIUM', '0') == '1'  # Start Selenium alongside a slow HTTP search instead of after it
+HEDGE_PERCENTILE = 0.9  # "Slow" = past this percentile of recent successful HTTP latencies
+HEDGE_MAX_RATE = float(os.getenv('HEDGE_MAX_RATE', 0.1))  # Fraction of searches that may start a hedge
+HEDGE_WINDOW = 60  # Seconds over which the hedge rate is measured
+
+# Search queue settings
+SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', 4))  # Worker threads serving user searches
+ADMIN_SEARCH_WORKERS = int(os.getenv('ADMIN_SEARCH_WORKERS', 1))  # Dedicated workers so admin searches are never starved
+SEARCH_QUEUE_SIZE = int(os.getenv('SEARCH_QUEUE_SIZE', 20))  # Waiting searches per lane before new ones are rejected
+ENGINE_CONCURRENCY = int(os.getenv('ENGINE_CONCURRENCY', 2))  # Concurrent outbound searches per engine
+
+# Result cache settings
+CACHE_TTL = int(os.getenv('CACHE_TTL', 3600))  # Seconds a cached result stays fresh
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 500))  # Least recently used entries are evicted first
+CACHE_DB = os.getenv('CACHE_DB', '')  # Optional SQLite file so the cache survives restarts
+
+# Raw result page archive (python dorker.py --replay re-parses it)
+SERP_ARCHIVE_DIR = os.getenv('SERP_ARCHIVE_DIR', '')  # Directory keeping every fetched result page (empty disables)
+SERP_ARCHIVE_CODEC = os.getenv('SERP_ARCHIVE_CODEC', 'zlib')  # zlib (fast) or lzma (smaller, slower to write)
+
+# Dork operators understood by the bot
+DORK_OPERATORS = ["intext", "intitle", "inurl", "filetype", "site", "ext"]
+# Operators whose values are case-insensitive
+CASELESS_OPERATORS = ["filetype", "site", "ext"]
+# Operators that mean the same thing, mapped to the spelling used in cache keys
+OPERATOR_ALIASES = {"ext": "filetype"}
+
+# Number of results shown per message page
+DISPLAY_LIMIT = 10
+# Telegram rejects messages longer than this
+MESSAGE_LIMIT = 4096
+
+# Fan-out settings (/dork --all or /engine all)
+ALL_ENGINES = "All"
+FANOUT_MIN_RESULTS = int(os.getenv('FANOUT_MIN_RESULTS', 5))  # Reply once one engine has this many hits
+
+# Batch settings (/batch with an uploaded file of queries)
+BATCH_MAX_QUERIES = int(os.getenv('BATCH_MAX_QUERIES', 500))  # Queries read from one file at most
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 2))  # Queries searched at the same time
+BATCH_ENGINE_BUDGET = int(os.getenv('BATCH_ENGINE_BUDGET', 50))  # Outbound searches per engine per batch
+BATCH_PROGRESS_INTERVAL = int(os.getenv('BATCH_PROGRESS_INTERVAL', 5))  # Seconds between progress updates
+
+# Watch settings (/watch saved dorks)
+WATCH_DB = os.getenv('WATCH_DB', 'watches.db')  # SQLite file holding saved dorks and their seen-URL index
+WATCH_DEFAULT_HOURS = int(os.getenv('WATCH_DEFAULT_HOURS', 24))  # Hours between runs unless given
+WATCH_MIN_HOURS = 1  # Shortest allowed interval between runs
+WATCH_MAX_PER_USER = int(os.getenv('WATCH_MAX_PER_USER', 20))
+
+# Paged result settings
+PAGER_IDLE_TIMEOUT = int(os.getenv('PAGER_IDLE_TIMEOUT', 600))  # Seconds before an idle result session is released
+PAGER_MAX_PAGES = int(os.getenv('PAGER_MAX_PAGES', 5))  # Engine result pages fetched per query at most
+
 # Alternative search engines
+# Each entry declares how to extract its results:
+#   results - CSS selector for the result containers
+#   link    - selector for the result link inside a container
+#   title   - selector for the title inside a container (defaults to the link text)
+#   exclude - drop links containing this string
+# how to page through them:
+#   page      - appended to the URL for later pages ({start} is 0-based, {first} 1-based)
+#   page_size - results per engine page
+# and how its query dialect differs:
+#   operators - dork operators spelled differently: name -> engine's name
+#               ("" searches the value as plain text, None means the engine cannot express it)
+#   filetypes - file types its filetype: filter accepts (default: any)
 SEARCH_ENGINES = [
-{"name": "Google", "url": "https://www.google.com/search?q={query}&num=20"},
-{"name": "Bing", "url": "https://www.bing.com/search?q={query}&count=20"},
-{"name": "DuckDuckGo", "url": "https://duckduckgo.com/html/?q={query}"}
+{"name": "Google", "url": "https://www.google.com/search?q={query}&num=20",
+ "results": "div.g", "link": "a", "title": "h3", "exclude": "google.com",
+ "page": "&start={start}", "page_size": 20},
+{"name": "Bing", "url": "https://www.bing.com/search?q={query}&count=20",
+ "results": "li.b_algo", "link": "h2 a",
+ "page": "&first={first}", "page_size": 20,
+ "operators": {"intext": "inbody"}},
+{"name": "DuckDuckGo", "url": "https://duckduckgo.com/html/?q={query}",
+ "results": "div.result", "link": "a.result__a",
+ "page": "&s={start}", "page_size": 30,
+ "operators": {"intext": ""},
+ "filetypes": ["pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "html"]}
 ]
 
-def load_rate_limit_data():
-    """Load rate limit data from file."""
-    global rate_limit_data
-    try:
-        if os.path.exists(rate_limit_file):
-            with open(rate_limit_file, 'r') as f:
-                rate_limit_data = json.load(f)
-            # Clean up old entries
-            now = datetime.now()
-            for user_id in list(rate_limit_data.keys()):
-                timestamp = datetime.fromisoformat(rate_limit_data[user_id]["timestamp"])
-                if now - timestamp > timedelta(hours=1):
-                    del rate_limit_data[user_id]
-    except Exception as e:
-        logger.error(f"Error loading rate limit data: {str(e)}")
-        rate_limit_data = {}
-    
-def save_rate_limit_data():
-    """Save rate limit data to file."""
+class Metrics:
+    """Thread-safe counters and histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._types = {}
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        self._types[name] = "counter"
+        self._help[name] = help_text
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._types[name] = "histogram"
+        self._help[name] = help_text
+        self._histograms.setdefault(name, {"buckets": buckets, "series": {}})
+
+    def callback(self, name, help_text, func, kind="gauge"):
+        """Register a metric whose {labels: value} are read from func() at scrape time."""
+        self._types[name] = kind
+        self._help[name] = help_text
+        self._callbacks[name] = func
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        histogram = self._histograms[name]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = histogram["series"].setdefault(
+                key, {"counts": [0] * len(histogram["buckets"]), "sum": 0.0, "count": 0}
+            )
+            for i, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def counters(self, name):
+        """Return {labels: value} for a counter."""
+        with self._lock:
+            return {labels: value for (n, labels), value in self._counters.items() if n == name}
+
+    def summary(self, name):
+        """Return {labels: (count, mean, approximate p50, approximate p95)} for a histogram."""
+        histogram = self._histograms[name]
+        buckets = histogram["buckets"]
+        summary = {}
+        with self._lock:
+            for labels, series in histogram["series"].items():
+                count = series["count"]
+                if not count:
+                    continue
+                quantiles = []
+                for q in (0.5, 0.95):
+                    bound = next((b for b, c in zip(buckets, series["counts"]) if c >= q * count), float("inf"))
+                    quantiles.append(bound)
+                summary[labels] = (count, series["sum"] / count, quantiles[0], quantiles[1])
+        return summary
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self):
+        """Render every metric in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                name: (h["buckets"], {k: dict(v, counts=list(v["counts"])) for k, v in h["series"].items()})
+                for name, h in self._histograms.items()
+            }
+        for name, kind in self._types.items():
+            lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            if name in self._callbacks:
+                try:
+                    values = self._callbacks[name]()
+                except Exception as e:
+                    logger.error(f"Error reading gauge {name}: {str(e)}")
+                    values = {}
+                for labels, value in values.items():
+                    lines.append(f"{name}{self._labels(labels)} {value}")
+            elif kind == "counter":
+                for (n, labels), value in counters.items():
+                    if n == name:
+                        lines.append(f"{name}{self._labels(labels)} {value}")
+            else:
+                buckets, series = histograms[name]
+                for labels, data in series.items():
+                    for bound, count in zip(buckets, data["counts"]):
+                        lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {data['count']}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {data['sum']}")
+                    lines.append(f"{name}_count{self._labels(labels)} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.histogram("dorker_search_seconds", "Search latency by engine and method.")
+metrics.histogram("dorker_parse_seconds", "Time spent extracting results from a page.")
+metrics.histogram("dorker_search_results", "Results returned per search.", buckets=RESULT_BUCKETS)
+metrics.histogram("dorker_queue_wait_seconds", "Time searches spent queued before a worker picked them up.")
+metrics.counter("dorker_search_errors_total", "Searches that raised an error.")
+metrics.counter("dorker_http_status_total", "Non-200 responses from search engines.")
+metrics.counter("dorker_selenium_fallbacks_total", "Searches that fell back to Selenium.")
+metrics.counter("dorker_rate_limit_rejections_total", "Searches rejected by the per-user rate limit.")
+metrics.counter("dorker_queue_rejections_total", "Searches rejected because the queue was full.")
+metrics.counter("dorker_circuit_skips_total", "Searches that skipped a method because its circuit was open.")
+metrics.counter("dorker_hedges_total", "Searches that started Selenium alongside a slow HTTP search.")
+metrics.counter("dorker_hedge_wins_total", "Hedged searches by the method that returned results first.")
+metrics.counter("dorker_unsupported_queries_total", "Searches not sent because the engine cannot express the query.")
+metrics.counter("dorker_archive_pages_total", "Result pages written to the SERP archive, by whether their content was new.")
+metrics.callback(
+    "dorker_circuit_open", "1 while a method's circuit is open or half-open.",
+    lambda: {
+        (("engine", engine), ("method", method)): int(health["state"] != "closed")
+        for (engine, method), health in engine_health.snapshot().items()
+    }
+)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serve /metrics for Prometheus scrapes."""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=METRICS_PORT):
+    """Start the metrics endpoint on localhost; returns the server or None if disabled."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Metrics available at http://127.0.0.1:{port}/metrics")
+    return server
+
+class Trace:
+    """Timed spans recorded for one search job."""
+
+    def __init__(self, name, **attrs):
+        self.id = os.urandom(4).hex()
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, duration, **attrs):
+        """Record a span that began at perf_counter() value `start`."""
+        with self._lock:
+            self.spans.append((start - self.start, duration, name, attrs))
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def format(self):
+        """Render the trace as a header line plus one line per span, in start order."""
+        attrs = " ".join(f"{k}={v}" for k, v in self.attrs.items())
+        lines = [f"{self.name} {attrs} - {self.duration:.2f}s"]
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[0])
+        for offset, duration, name, span_attrs in spans:
+            extra = " ".join(f"{k}={v}" for k, v in span_attrs.items())
+            lines.append(f"  +{offset:.2f}s {name} {duration * 1000:.0f} ms {extra}".rstrip())
+        return "\n".join(lines)
+
+# The trace the current search job records into; copied into the threads and tasks it starts
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+class Tracer:
+    """Ring buffer of recent search traces, plus the span API that fills them."""
+
+    def __init__(self, size=TRACE_BUFFER_SIZE):
+        self._traces = deque(maxlen=size)
+        self._active = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def begin(self, name, **attrs):
+        """Start a trace for the enclosed code; a job queued inside it inherits and finishes it."""
+        trace = Trace(name, **attrs)
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            current_trace.reset(token)
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """Trace the enclosed code and record it when it finishes."""
+        with self.begin(name, **attrs) as trace:
+            try:
+                yield trace
+            finally:
+                self.finish(trace)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed code as a span of the current trace; yields a dict for extra attributes."""
+        trace = current_trace.get()
+        if trace is None:
+            yield attrs
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            trace.add(name, start, time.perf_counter() - start, **attrs)
+            with self._lock:
+                self._active[ident] -= 1
+                if not self._active[ident]:
+                    del self._active[ident]
+
+    def finish(self, trace):
+        """Close a trace and keep it in the buffer."""
+        trace.finish()
+        with self._lock:
+            self._traces.append(trace)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(trace)
+
+    def add_listener(self, listener):
+        """Call listener(trace) whenever a trace finishes."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def active_threads(self):
+        """Return the ids of threads currently inside a span."""
+        with self._lock:
+            return list(self._active)
+
+    def slowest(self, count):
+        """Return the slowest traces in the buffer, slowest first."""
+        with self._lock:
+            traces = list(self._traces)
+        return sorted(traces, key=lambda trace: trace.duration, reverse=True)[:count]
+
+tracer = Tracer()
+
+def run_traced(func, args, name, waited):
+    """Run a queued job inside its trace (the one it was queued under, or a new one) and record it."""
+    trace = current_trace.get()
+    if trace is None:
+        trace = Trace(name)
+        current_trace.set(trace)
+    trace.add("queue", time.perf_counter() - waited, waited)
     try:
-        with open(rate_limit_file, 'w') as f:
-            json.dump(rate_limit_data, f)
-    except Exception as e:
-        logger.error(f"Error saving rate limit data: {str(e)}")
-    
+        func(*args)
+    finally:
+        tracer.finish(trace)
+
+def submit_in_context(executor, func, *args):
+    """Submit to an executor so the work records into the caller's trace."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+class Profiler:
+    """Sampling profiler that records the stacks of threads inside trace spans for the next N searches."""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.remaining = 0
+        self._on_done = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, searches, on_done):
+        """Profile the next `searches` traces, then call on_done(report); False if already running."""
+        with self._lock:
+            if self.running():
+                return False
+            self.samples = Counter()
+            self.remaining = searches
+            self._on_done = on_done
+            self._stop.clear()
+            tracer.add_listener(self._trace_finished)
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def _trace_finished(self, trace):
+        with self._lock:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self._stop.set()
+
+    def _run(self):
+        deadline = time.monotonic() + PROFILE_MAX_SECONDS
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident in tracer.active_threads():
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+        tracer.remove_listener(self._trace_finished)
+        try:
+            self._on_done(self.report())
+        except Exception as e:
+            logger.error(f"Error delivering profile: {str(e)}")
+
+    def report(self, top=15):
+        """Return (summary text, collapsed stacks for flame graph tools)."""
+        total = sum(self.samples.values())
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        lines = [f"Profile: {total} samples every {self.interval * 1000:.0f} ms", "", "Top functions (self):"]
+        lines += [f"{count / total:6.1%}  {frame}" for frame, count in own.most_common(top)] if total else ["none"]
+        lines += ["", "Top functions (including callees):"]
+        lines += [f"{count / total:6.1%}  {frame}" for frame, count in inclusive.most_common(top)] if total else ["none"]
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+        return "\n".join(lines), collapsed
+
+profiler = Profiler()
+
+class SQLiteStore:
+    """Shared state in one SQLite file (WAL mode); serves every process on a single host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        self._window = RATE_LIMIT_WINDOW
+        db = self._conn()
+        db.execute("CREATE TABLE IF NOT EXISTS rate_hits (user_id TEXT NOT NULL, ts REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS rate_hits_user ON rate_hits (user_id, ts)")
+        db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, lane TEXT NOT NULL, payload TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS jobs_lane ON jobs (lane, id)")
+
+    def _conn(self):
+        """Return this thread's connection; transactions are managed explicitly."""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _write(self):
+        """Run a write transaction that holds the database lock from the start."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def rate_hit(self, user_id, limit, window, exempt=False):
+        """Record a search if the user is under the limit; return False when limited."""
+        now = time.time()
+        self._window = window
+        with self._write() as db:
+            db.execute("DELETE FROM rate_hits WHERE user_id = ? AND ts <= ?", (user_id, now - window))
+            count = db.execute("SELECT COUNT(*) FROM rate_hits WHERE user_id = ?", (user_id,)).fetchone()[0]
+            if count >= limit and not exempt:
+                return False
+            db.execute("INSERT INTO rate_hits (user_id, ts) VALUES (?, ?)", (user_id, now))
+            return True
+
+    def rate_usage(self, user_id, window):
+        """Return (searches used in the window, seconds until the oldest one expires)."""
+        now = time.time()
+        count, oldest = self._conn().execute(
+            "SELECT COUNT(*), MIN(ts) FROM rate_hits WHERE user_id = ? AND ts > ?", (user_id, now - window)
+        ).fetchone()
+        return count, max(0, oldest + window - now) if count else 0
+
+    def get(self, key):
+        """Return the JSON value stored under key, or None."""
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON value, expiring after ttl seconds if given."""
+        expires_at = time.time() + ttl if ttl else None
+        with self._write() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+        if time.time() - self._last_sweep > 60:
+            self.sweep()
+
+    def sweep(self):
+        """Delete expired values and searches that have left the rate limit window."""
+        now = time.time()
+        self._last_sweep = now
+        with self._write() as db:
+            db.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            db.execute("DELETE FROM rate_hits WHERE ts <= ?", (now - self._window,))
+
+    def push(self, lane, payload):
+        """Append a job to a lane's queue."""
+        with self._write() as db:
+            db.execute("INSERT INTO jobs (lane, payload) VALUES (?, ?)", (lane, json.dumps(payload)))
+
+    def pop(self, lane, timeout):
+        """Take the oldest job from a lane, waiting up to timeout seconds; returns None if there is none."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._write() as db:
+                row = db.execute(
+                    "SELECT id, payload FROM jobs WHERE lane = ? ORDER BY id LIMIT 1", (lane,)
+                ).fetchone()
+                if row:
+                    db.execute("DELETE FROM jobs WHERE id = ?", (row[0],))
+                    return json.loads(row[1])
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+
+    def depth(self, lane):
+        """Return the number of jobs waiting in a lane."""
+        return self._conn().execute("SELECT COUNT(*) FROM jobs WHERE lane = ?", (lane,)).fetchone()[0]
+
+class RedisStore:
+    """Shared state in Redis; serves processes on any number of hosts."""
+
+    # Trim the user's log and add the new search in one atomic step
+    RATE_HIT_SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1] - ARGV[2])
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) and ARGV[4] == '0' then
+        return 0
+    end
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[5])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+    """
+
+    def __init__(self, url, prefix='dorker:'):
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._rate_hit = self._redis.register_script(self.RATE_HIT_SCRIPT)
+
+    def rate_hit(self, user_id, limit, window, exempt=False):
+        """Record a search if the user is under the limit; return False when limited."""
+        now = time.time()
+        allowed = self._rate_hit(
+            keys=[f"{self.prefix}rate:{user_id}"],
+            args=[now, window, limit, int(exempt), f"{now}:{os.urandom(4).hex()}"]
+        )
+        return bool(allowed)
+
+    def rate_usage(self, user_id, window):
+        """Return (searches used in the window, seconds until the oldest one expires)."""
+        key = f"{self.prefix}rate:{user_id}"
+        now = time.time()
+        self._redis.zremrangebyscore(key, '-inf', now - window)
+        oldest = self._redis.zrange(key, 0, 0, withscores=True)
+        if not oldest:
+            return 0, 0
+        return self._redis.zcard(key), max(0, oldest[0][1] + window - now)
+
+    def get(self, key):
+        """Return the JSON value stored under key, or None."""
+        value = self._redis.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON value, expiring after ttl seconds if given."""
+        self._redis.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def sweep(self):
+        """Nothing to do; Redis expires keys itself."""
+
+    def push(self, lane, payload):
+        """Append a job to a lane's queue."""
+        self._redis.rpush(f"{self.prefix}jobs:{lane}", json.dumps(payload))
+
+    def pop(self, lane, timeout):
+        """Take the oldest job from a lane, waiting up to timeout seconds; returns None if there is none."""
+        item = self._redis.blpop(f"{self.prefix}jobs:{lane}", timeout=max(1, int(timeout)))
+        return json.loads(item[1]) if item else None
+
+    def depth(self, lane):
+        """Return the number of jobs waiting in a lane."""
+        return self._redis.llen(f"{self.prefix}jobs:{lane}")
+
+def open_shared_store(url):
+    """Open the shared store named by a sqlite:/// or redis:// URL; returns None for an empty URL."""
+    if not url:
+        return None
+    if url.startswith('sqlite:///'):
+        return SQLiteStore(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("SHARED_STORE uses Redis but the redis package is not installed")
+        return RedisStore(url)
+    raise ValueError(f"Unsupported SHARED_STORE: {url}")
+
+shared_store = None
+
+def get_shared_store():
+    """Open the shared store on first use; None when state stays in-process."""
+    global shared_store
+    if shared_store is None and SHARED_STORE:
+        shared_store = open_shared_store(SHARED_STORE)
+    return shared_store
+
+def get_engine_preference(context, user_id):
+    """Return the user's preferred search engine, defaulting to Google."""
+    store = get_shared_store()
+    if store is not None:
+        return store.get(f"prefs:{user_id}:engine") or 'Google'
+    return context.user_data.get('search_engine', 'Google') if context.user_data else 'Google'
+
+def set_engine_preference(context, user_id, engine):
+    """Remember the user's preferred search engine."""
+    store = get_shared_store()
+    if store is not None:
+        store.set(f"prefs:{user_id}:engine", engine)
+        return
+    context.user_data['search_engine'] = engine
+
+class RateLimiter:
+    """Sliding-log rate limiter kept in memory and flushed to SQLite periodically, or kept in a shared store."""
+
+    def __init__(self, limit=RATE_LIMIT, window=RATE_LIMIT_WINDOW, db_path=RATE_LIMIT_DB,
+                 flush_interval=RATE_LIMIT_FLUSH_INTERVAL, store=None):
+        self.limit = limit
+        self.window = window
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.store = store
+        self._logs = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS searches (user_id TEXT NOT NULL, ts REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS searches_ts ON searches (ts)")
+        return db
+
+    def _trim(self, log, now):
+        """Drop timestamps that have left the window."""
+        cutoff = now - self.window
+        while log and log[0] <= cutoff:
+            log.popleft()
+
+    def load(self):
+        """Load searches still inside the window from the database."""
+        try:
+            db = self._connect()
+            try:
+                rows = db.execute(
+                    "SELECT user_id, ts FROM searches WHERE ts > ? ORDER BY ts",
+                    (time.time() - self.window,)
+                ).fetchall()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error loading rate limit data: {str(e)}")
+            return
+        with self._lock:
+            for user_id, ts in rows:
+                self._logs.setdefault(user_id, deque()).append(ts)
+
+    def hit(self, user_id, exempt=False):
+        """Record a search if the user is under the limit; return False when limited."""
+        user_id_str = str(user_id)
+        if self.store is not None:
+            # Checked and recorded atomically so limits stay exact across processes
+            return self.store.rate_hit(user_id_str, self.limit, self.window, exempt)
+        now = time.time()
+        with self._lock:
+            log = self._logs.setdefault(user_id_str, deque())
+            self._trim(log, now)
+            if len(log) >= self.limit and not exempt:
+                return False
+            log.append(now)
+            self._pending.append((user_id_str, now))
+            return True
+
+    def usage(self, user_id):
+        """Return (searches used in the window, seconds until the oldest one expires)."""
+        if self.store is not None:
+            return self.store.rate_usage(str(user_id), self.window)
+        now = time.time()
+        with self._lock:
+            log = self._logs.get(str(user_id))
+            if not log:
+                return 0, 0
+            self._trim(log, now)
+            if not log:
+                return 0, 0
+            return len(log), max(0, log[0] + self.window - now)
+
+    def sweep(self):
+        """Forget users whose searches have all expired."""
+        now = time.time()
+        with self._lock:
+            for user_id in list(self._logs.keys()):
+                log = self._logs[user_id]
+                self._trim(log, now)
+                if not log:
+                    del self._logs[user_id]
+
+    def flush(self):
+        """Append pending searches to the database and prune expired rows."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        try:
+            db = self._connect()
+            try:
+                with db:
+                    if pending:
+                        db.executemany("INSERT INTO searches (user_id, ts) VALUES (?, ?)", pending)
+                    db.execute("DELETE FROM searches WHERE ts <= ?", (time.time() - self.window,))
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error saving rate limit data: {str(e)}")
+            with self._lock:
+                self._pending[:0] = pending
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.sweep()
+            self.flush()
+
+    def start(self):
+        """Load persisted state and start the background flush thread."""
+        if self.store is not None:
+            return
+        self.load()
+        self._thread = threading.Thread(target=self._run, name="rate-limit-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write out anything pending."""
+        if self.store is not None:
+            return
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+rate_limiter = RateLimiter()
+
 def check_rate_limit(user_id):
     """Check if user has exceeded rate limit."""
-    user_id_str = str(user_id)
-    now = datetime.now()
-        
-    if user_id_str not in rate_limit_data:
-        rate_limit_data[user_id_str] = {
-            "count": 1,
-            "timestamp": now.isoformat()
-        }
-        save_rate_limit_data()
-        return True
-        
-    user_data = rate_limit_data[user_id_str]
-    timestamp = datetime.fromisoformat(user_data["timestamp"])
-        
-    # Reset if more than an hour has passed
-    if now - timestamp > timedelta(hours=1):
-        rate_limit_data[user_id_str] = {
-            "count": 1,
-            "timestamp": now.isoformat()
-        }
-        save_rate_limit_data()
-        return True
-        
-    # Check if limit exceeded
-    if user_data["count"] >= RATE_LIMIT and not is_admin(user_id):
-        return False
-        
-    # Increment count
-    user_data["count"] += 1
-    save_rate_limit_data()
-    return True
+    allowed = rate_limiter.hit(user_id, exempt=is_admin(user_id))
+    if not allowed:
+        metrics.inc("dorker_rate_limit_rejections_total")
+    return allowed
     
 def is_admin(user_id):
     """Check if the user is an admin."""
@@ -146,8 +983,14 @@ def help_command(update: Update, context: CallbackContext) -> None:
         '/whoami - Show your Telegram ID\n'
         '/status - Show bot status and rate limits\n'
         '/setadmin [id] - Set a new admin ID (admin only)\n'
-        '/engine [name] - Set search engine (Google, Bing, DuckDuckGo)\n\n'
-        'Example: /dork intext:password filetype:txt\n\n'
+        '/engine [name] - Set search engine (Google, Bing, DuckDuckGo, All)\n'
+        '/metrics - Show search latency and error metrics (admin only)\n'
+        '/traces [n] - Show the slowest recent searches stage by stage (admin only)\n'
+        '/profile [n] - Profile the next n searches (admin only)\n'
+        '/watch add [24h] [query] - Re-run a dork on a schedule and get only new results\n'
+        '/batch - Search every dork in an uploaded text file (send the file with /batch as caption)\n\n'
+        'Example: /dork intext:password filetype:txt\n'
+        'Add --all to search every engine at once: /dork --all inurl:admin\n\n'
         'Common Google Dork Operators:\n'
         '- intext: - Searches for specific text within pages\n'
         '- intitle: - Searches for specific text in page titles\n'
@@ -166,215 +1009,1810 @@ def get_random_proxy():
         return None
     return random.choice(PROXIES)
     
-def get_search_url(engine_name, query):
-    """Get the search URL for the specified engine."""
-    engine = next((e for e in SEARCH_ENGINES if e["name"].lower() == engine_name.lower()), SEARCH_ENGINES[0])
-    return engine["url"].format(query=requests.utils.quote(query))
+def find_engine(engine_name):
+    """Look up an engine by name (case-insensitive); returns None if unknown."""
+    return next((e for e in SEARCH_ENGINES if e["name"].lower() == engine_name.lower()), None)
+
+def get_engine(engine_name):
+    """Get the engine entry for a name, defaulting to the first engine."""
+    return find_engine(engine_name) or SEARCH_ENGINES[0]
+
+class UnsupportedQuery(ValueError):
+    """Raised when an engine cannot express a dork query."""
+
+class SearchFailed(Exception):
+    """Raised when a search method errors, times out, gets a non-200 response or a block page.
+
+    A page that simply has no results is not a failure and comes back as [].
+    """
+
+def is_block_page(html):
+    """Return True if a page without results looks like a captcha or block page."""
+    text = html.lower()
+    return any(marker in text for marker in BLOCK_PAGE_MARKERS)
+
+class DorkQuery:
+    """A dork query parsed into tokens, in query order: plain terms and operator filters.
+
+    Operator tokens are (opening parens, name, value, negated, closing parens) so the
+    query can be rewritten in place without disturbing OR, | or grouping.
+    """
+
+    def __init__(self, tokens, boolean=False):
+        self.tokens = tuple(tokens)
+        # OR, | or parentheses make token order meaningful
+        self.boolean = boolean
+
+    @property
+    def terms(self):
+        return tuple(token for token in self.tokens if isinstance(token, str))
+
+    @property
+    def operators(self):
+        return tuple(sorted({token[1:4] for token in self.tokens if not isinstance(token, str)}))
+
+    @staticmethod
+    def _format(name, value, negated):
+        return f"{'-' if negated else ''}{name}:{value}"
+
+    def key(self):
+        """Return the canonical form of the query, shared by every equivalent spelling."""
+        if self.boolean:
+            # Reordering would change which terms each connective binds
+            return ' '.join(
+                token if isinstance(token, str) else token[0] + self._format(*token[1:4]) + token[4]
+                for token in self.tokens
+            )
+        return ' '.join(self.terms + tuple(self._format(*op) for op in self.operators))
+
+    def compile(self, engine_name):
+        """Rewrite the query in an engine's dialect; raises UnsupportedQuery if the engine cannot express it."""
+        engine = get_engine(engine_name)
+        dialect = engine.get("operators", {})
+        filetypes = engine.get("filetypes")
+        parts = []
+        for token in self.tokens:
+            if isinstance(token, str):
+                parts.append(token)
+                continue
+            opening, name, value, negated, closing = token
+            target = dialect.get(name, name)
+            if target is None:
+                raise UnsupportedQuery(f"{engine['name']} does not support {name}:")
+            if name == "filetype" and filetypes and value.strip('"') not in filetypes:
+                raise UnsupportedQuery(f"{engine['name']} only filters filetype: {', '.join(filetypes)}")
+            if target:
+                parts.append(opening + self._format(target, value, negated) + closing)
+            else:
+                parts.append(f"{opening}{'-' if negated else ''}{value}{closing}")
+        return ' '.join(parts)
+
+@functools.lru_cache(maxsize=1024)
+def parse_dork(query):
+    """Parse a dork query once; every cache lookup and engine request reuses the result."""
+    tokens = []
+    for token in re.findall(r'\(*(?:[^\s":()]+:)?"[^"]*"\)*|\S+', query):
+        # Grouping parens stay attached to the operator they surround
+        core = token.lstrip('(')
+        opening = token[:len(token) - len(core)]
+        body = core.rstrip(')')
+        closing = core[len(body):]
+        core = body
+        name, sep, value = core.partition(':')
+        negated = name.startswith('-')
+        name = name[1:].lower() if negated else name.lower()
+        if sep and name in DORK_OPERATORS and value:
+            name = OPERATOR_ALIASES.get(name, name)
+            if name in CASELESS_OPERATORS:
+                value = value.lower()
+            tokens.append((opening, name, value, negated, closing))
+        else:
+            tokens.append(token)
+    unquoted = re.sub(r'"[^"]*"', ' ', query)
+    boolean = bool(re.search(r'[()|]|(?<!\S)OR(?!\S)', unquoted))
+    return DorkQuery(tokens, boolean)
+
+def compile_query(query, engine_name):
+    """Rewrite a dork query for an engine; raises UnsupportedQuery if it cannot be expressed."""
+    return parse_dork(query).compile(engine_name)
+
+def supported_engines(query, engines=None):
+    """Return the names of the engines (default: all) that can express a query."""
+    names = engines or [e["name"] for e in SEARCH_ENGINES]
+    supported = []
+    for name in names:
+        try:
+            compile_query(query, name)
+        except UnsupportedQuery:
+            continue
+        supported.append(name)
+    return supported
+
+def get_search_url(engine_name, query, page=0):
+    """Get the search URL for the specified engine and result page."""
+    engine = get_engine(engine_name)
+    url = engine["url"].format(query=quote(compile_query(query, engine_name)))
+    if page:
+        start = page * engine["page_size"]
+        url += engine["page"].format(start=start, first=start + 1)
+    return url
     
-def search_with_requests(query: str, engine="Google") -> list:
-    """Search using requests library with rotating user agents."""
-    try:
-        ua = UserAgent()
-        headers = {
-            'User-Agent': ua.random,
+class MethodHealth:
+    """Latency and success tracking with a circuit breaker for one engine/method pair."""
+
+    def __init__(self):
+        self.latency = None
+        self.success_rate = 1.0
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probing = False
+        self.latencies = deque(maxlen=100)
+
+class HealthTracker:
+    """Per-engine, per-method health used to skip failing methods and size timeouts."""
+
+    def __init__(self):
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def _get(self, engine, method):
+        key = (get_engine(engine)["name"], method)
+        if key not in self._health:
+            self._health[key] = MethodHealth()
+        return self._health[key]
+
+    def allow(self, engine, method):
+        """Return True if the method should be tried; lets one probe through an open circuit."""
+        with self._lock:
+            health = self._get(engine, method)
+            if health.state == "closed":
+                return True
+            if health.state == "open" and time.monotonic() - health.opened_at >= CIRCUIT_OPEN_SECONDS:
+                health.state = "half_open"
+            if health.state == "half_open" and not health.probing:
+                health.probing = True
+                return True
+            return False
+
+    def record(self, engine, method, latency, success):
+        """Record the outcome of a search."""
+        engine = get_engine(engine)["name"]
+        with self._lock:
+            health = self._get(engine, method)
+            health.probing = False
+            if health.latency is None:
+                health.latency = latency
+            else:
+                health.latency += HEALTH_EWMA_ALPHA * (latency - health.latency)
+            health.success_rate += HEALTH_EWMA_ALPHA * ((1.0 if success else 0.0) - health.success_rate)
+
+            if success:
+                health.latencies.append(latency)
+                health.failures = 0
+                if health.state != "closed":
+                    logger.info(f"{engine}/{method} recovered, closing circuit")
+                health.state = "closed"
+            else:
+                health.failures += 1
+                if health.state == "half_open" or (
+                    health.state == "closed" and health.failures >= CIRCUIT_FAILURE_THRESHOLD
+                ):
+                    if health.state == "closed":
+                        logger.warning(f"{engine}/{method} failed {health.failures} times in a row, opening circuit")
+                    health.state = "open"
+                    health.opened_at = time.monotonic()
+
+    def is_closed(self, engine, method):
+        """Return True if the method's circuit is closed (healthy)."""
+        with self._lock:
+            return self._get(engine, method).state == "closed"
+
+    def percentile(self, engine, method, q):
+        """Return the q-th percentile of recent successful latencies, or None without samples."""
+        with self._lock:
+            latencies = sorted(self._get(engine, method).latencies)
+        if len(latencies) < 10:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def timeout(self, engine, method):
+        """Return a timeout derived from observed latencies, within the configured bounds."""
+        observed = self.percentile(engine, method, SEARCH_TIMEOUT_PERCENTILE)
+        if observed is None:
+            return SEARCH_TIMEOUT_MAX
+        return max(SEARCH_TIMEOUT_MIN, min(SEARCH_TIMEOUT_MAX, observed * SEARCH_TIMEOUT_FACTOR))
+
+    def snapshot(self):
+        """Return {(engine, method): stats} for display."""
+        with self._lock:
+            return {
+                key: {
+                    "state": health.state,
+                    "latency": health.latency,
+                    "success_rate": health.success_rate,
+                    "failures": health.failures
+                }
+                for key, health in self._health.items()
+            }
+
+engine_health = HealthTracker()
+
+class UserAgentProvider:
+    """Load the fake-useragent data once, in the background, and hand out user agents from memory.
+
+    Until the data is loaded (or if it cannot be), user agents come from FALLBACK_USER_AGENTS.
+    """
+
+    def __init__(self):
+        self._ua = None
+        self._loader = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            from fake_useragent import UserAgent
+            ua = UserAgent()
+            ua.random  # Make sure the data is usable before switching over
+            self._ua = ua
+        except Exception as e:
+            logger.warning(f"Using bundled user agents, fake-useragent failed to load: {str(e)}")
+
+    def preload(self):
+        """Start loading the user agent data in a background thread."""
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load, name="ua-loader", daemon=True)
+                self._loader.start()
+
+    def random(self):
+        """Return a random user agent string without ever blocking on the data load."""
+        if self._ua is None:
+            self.preload()
+            return random.choice(FALLBACK_USER_AGENTS)
+        try:
+            return self._ua.random
+        except Exception as e:
+            logger.debug(f"Falling back to bundled user agent: {str(e)}")
+            return random.choice(FALLBACK_USER_AGENTS)
+
+user_agents = UserAgentProvider()
+
+class SearchClient:
+    """Long-lived HTTP sessions for the search engines, one per configured proxy."""
+
+    def __init__(self, pool_maxsize=HTTP_POOL_MAXSIZE):
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self, proxy):
+        """Build a session with a keep-alive connection pool per engine host."""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=len(SEARCH_ENGINES),
+            pool_maxsize=self.pool_maxsize
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
             'Accept': 'text/html,application/xhtml+xml,application/xml',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.google.com/'
-        }
-            
-        url = get_search_url(engine, query)
-            
-        proxies = {}
-        proxy = get_random_proxy()
+            'Accept-Encoding': ACCEPT_ENCODING
+        })
         if proxy:
-            proxies = {
+            session.proxies = {
                 "http": proxy,
                 "https": proxy
             }
-            
-        response = requests.get(
-            url, 
-            headers=headers, 
-            proxies=proxies if proxies else None,
-            timeout=15
-        )
-            
+        return session
+
+    def session(self, proxy=None):
+        """Get (or create) the session for a proxy; None means a direct connection."""
+        with self._lock:
+            if proxy not in self._sessions:
+                self._sessions[proxy] = self._create_session(proxy)
+            return self._sessions[proxy]
+
+    def get(self, url, headers=None, timeout=15):
+        """GET a URL through a pooled session, picking a random proxy if enabled."""
+        return self.session(get_random_proxy()).get(url, headers=headers, timeout=timeout)
+
+    def close(self):
+        """Close every session and its connection pool."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+search_client = SearchClient()
+
+def search_with_requests(query: str, engine="Google", page=0, timeout=SEARCH_TIMEOUT_MAX) -> list:
+    """Search using pooled HTTP sessions with rotating user agents."""
+    engine = get_engine(engine)["name"]
+    started = time.monotonic()
+    results = []
+    try:
+        headers = {
+            'User-Agent': user_agents.random(),
+            'Referer': 'https://www.google.com/'
+        }
+
+        url = get_search_url(engine, query, page)
+        with tracer.span("http", engine=engine) as span:
+            response = search_client.get(url, headers=headers, timeout=timeout)
+            # Time to response headers, i.e. DNS, connect, TLS and server time
+            span["ttfb"] = f"{response.elapsed.total_seconds():.3f}s"
+            span["status"] = response.status_code
+            span["bytes"] = len(response.content)
+
         if response.status_code != 200:
             logger.error(f"Request failed with status code: {response.status_code}")
-            return []
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = []
-            
-        # Extract search results based on engine
-        if engine.lower() == "google":
-            for g in soup.find_all('div', class_='g'):
-                anchors = g.find_all('a')
-                if anchors:
-                    link = anchors[0]['href']
-                    title = g.find('h3')
-                    if title and link.startswith('http') and 'google.com' not in link:
-                        results.append({
-                            'title': title.text,
-                            'link': link
-                        })
-        elif engine.lower() == "bing":
-            for result in soup.find_all('li', class_='b_algo'):
-                link_elem = result.find('a')
-                if link_elem and 'href' in link_elem.attrs:
-                    link = link_elem['href']
-                    title = link_elem.text
-                    if link.startswith('http'):
-                        results.append({
-                            'title': title,
-                            'link': link
-                        })
-        elif engine.lower() == "duckduckgo":
-            for result in soup.find_all('div', class_='result'):
-                link_elem = result.find('a', class_='result__a')
-                if link_elem and 'href' in link_elem.attrs:
-                    link = link_elem['href']
-                    title = link_elem.text
-                    if link.startswith('http'):
-                        results.append({
-                            'title': title,
-                            'link': link
-                        })
+            metrics.inc("dorker_http_status_total", engine=engine, code=response.status_code)
+            raise SearchFailed(f"{engine} returned status {response.status_code}")
             
+        parse_started = time.monotonic()
+        results = extract_results(engine, response.text)
+        metrics.observe("dorker_parse_seconds", time.monotonic() - parse_started, engine=engine)
+        archive_page(engine, query, page, url, "requests", response.text, len(results))
+        if not results and is_block_page(response.text):
+            raise SearchFailed(f"{engine} returned a block page")
         return results
+    except SearchFailed:
+        raise
     except Exception as e:
         logger.error(f"Requests search error: {str(e)}")
-        return []
+        metrics.inc("dorker_search_errors_total", engine=engine, method="requests")
+        raise SearchFailed(str(e) or type(e).__name__) from e
+    finally:
+        metrics.observe("dorker_search_seconds", time.monotonic() - started, engine=engine, method="requests")
+        metrics.observe("dorker_search_results", len(results), engine=engine, method="requests")
     
-def search_with_selenium(query: str, engine="Google") -> list:
-    """Search using Selenium WebDriver."""
-    driver = None
+class AsyncSearchCore:
+    """Event loop thread serving many searches over one aiohttp connection pool.
+
+    Coroutines such as async_search() run on the loop; sync code reaches them through
+    submit() (a cancellable concurrent future) or run() (blocks with a deadline).
+    """
+
+    def __init__(self, max_connections=ASYNC_MAX_CONNECTIONS, per_host=HTTP_POOL_MAXSIZE):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.loop = None
+        self._session = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name="async-search", daemon=True)
+                self._thread.start()
+        return self.loop
+
+    async def session(self):
+        """Return the shared client session, creating it on the loop on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._trace_config()],
+                headers={
+                    'Accept': 'text/html,application/xhtml+xml,application/xml',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                    'Accept-Encoding': ACCEPT_ENCODING
+                }
+            )
+        return self._session
+
+    @staticmethod
+    def _trace_config():
+        """Report DNS, connect (TCP and TLS) and time-to-headers as spans of the current trace."""
+
+        def stage(name):
+            async def on_start(session, ctx, params):
+                setattr(ctx, name, time.perf_counter())
+
+            async def on_end(session, ctx, params):
+                trace = current_trace.get()
+                start = getattr(ctx, name, None)
+                if trace is not None and start is not None:
+                    trace.add(name, start, time.perf_counter() - start)
+            return on_start, on_end
+
+        config = aiohttp.TraceConfig()
+        dns_start, dns_end = stage("dns")
+        connect_start, connect_end = stage("connect")
+        http_start, http_end = stage("http")
+        config.on_dns_resolvehost_start.append(dns_start)
+        config.on_dns_resolvehost_end.append(dns_end)
+        config.on_connection_create_start.append(connect_start)
+        config.on_connection_create_end.append(connect_end)
+        config.on_request_start.append(http_start)
+        config.on_request_end.append(http_end)
+        return config
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop (in the caller's context); cancelling the returned future cancels the task."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine from sync code, cancelling it if it outlives `timeout`."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    def close(self):
+        """Close the client session and stop the loop."""
+        if self.loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
+
+async_core = AsyncSearchCore()
+
+async def async_search(query, engine="Google", page=0, timeout=SEARCH_TIMEOUT_MAX):
+    """Awaitable counterpart of search_with_requests with a per-request deadline."""
+    engine = get_engine(engine)["name"]
+    started = time.monotonic()
+    results = []
     try:
-        # Configure Chrome options
-        chrome_options = Options()
+        session = await async_core.session()
+        headers = {
+            'User-Agent': user_agents.random(),
+            'Referer': 'https://www.google.com/'
+        }
+        url = get_search_url(engine, query, page)
+        async with session.get(
+            url,
+            headers=headers,
+            proxy=get_random_proxy(),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status != 200:
+                logger.error(f"Request failed with status code: {response.status}")
+                metrics.inc("dorker_http_status_total", engine=engine, code=response.status)
+                raise SearchFailed(f"{engine} returned status {response.status}")
+            with tracer.span("read", engine=engine) as span:
+                html = await response.text(errors='replace')
+                span["chars"] = len(html)
+
+        # Parse off the loop so one large page does not stall other searches
+        parse_started = time.monotonic()
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, contextvars.copy_context().run, extract_results, engine, html
+        )
+        metrics.observe("dorker_parse_seconds", time.monotonic() - parse_started, engine=engine)
+        archive_page(engine, query, page, url, "requests", html, len(results))
+        if not results and is_block_page(html):
+            raise SearchFailed(f"{engine} returned a block page")
+        return results
+    except (asyncio.CancelledError, SearchFailed):
+        raise
+    except Exception as e:
+        logger.error(f"Async search error: {str(e) or type(e).__name__}")
+        metrics.inc("dorker_search_errors_total", engine=engine, method="requests")
+        raise SearchFailed(str(e) or type(e).__name__) from e
+    finally:
+        metrics.observe("dorker_search_seconds", time.monotonic() - started, engine=engine, method="requests")
+        metrics.observe("dorker_search_results", len(results), engine=engine, method="requests")
+
+def fetch_with_requests(query, engine, page=0, timeout=SEARCH_TIMEOUT_MAX):
+    """Run the HTTP search method, on the async core when it is enabled."""
+    if ASYNC_SEARCH:
+        try:
+            # Allow a little slack over the request deadline before cancelling
+            return async_core.run(async_search(query, engine, page, timeout), timeout + 1)
+        except SearchFailed:
+            raise
+        except Exception as e:
+            raise SearchFailed(f"Async search cancelled: {str(e) or type(e).__name__}") from e
+    return search_with_requests(query, engine, page, timeout=timeout)
+
+def _split_selector(selector):
+    """Split a simple selector like 'div.g' into ('div', 'g')."""
+    tag, _, cls = selector.partition('.')
+    return tag or None, cls or None
+
+@functools.lru_cache(maxsize=None)
+def _compile_xpath(selector):
+    """Translate a descendant CSS selector ('h2 a', 'a.result__a') into a relative XPath."""
+    steps = []
+    for part in selector.split():
+        tag, cls = _split_selector(part)
+        step = tag or '*'
+        if cls:
+            step += f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+        steps.append(step)
+    return etree.XPath('.//' + '//'.join(steps))
+
+def _make_result(spec, link, title):
+    """Build a result dict, or None if the link should be skipped."""
+    if not link or not title or not link.startswith('http'):
+        return None
+    if spec.get("exclude") and spec["exclude"] in link:
+        return None
+    return {
+        'title': title,
+        'link': link
+    }
+
+def _extract_with_lxml(spec, html, limit):
+    """Stream the page through lxml, only looking at result containers."""
+    tag, cls = _split_selector(spec["results"])
+    find_link = _compile_xpath(spec["link"])
+    find_title = _compile_xpath(spec["title"]) if spec.get("title") else None
+    results = []
+    source = io.BytesIO(html.encode('utf-8') if isinstance(html, str) else html)
+    for _, container in etree.iterparse(source, events=('end',), tag=tag or '*', html=True,
+                                        recover=True, encoding='utf-8'):
+        if cls and cls not in (container.get('class') or '').split():
+            continue
+        links = find_link(container)
+        if links:
+            title_elems = find_title(container) if find_title else links
+            title = ''.join(title_elems[0].itertext()) if title_elems else None
+            result = _make_result(spec, links[0].get('href'), title)
+            if result:
+                results.append(result)
+                if len(results) >= limit:
+                    break
+        # Nested containers are already handled; drop the subtree to keep memory flat
+        container.clear()
+    return results
+
+def _extract_with_bs4(spec, html, limit):
+    """Parse only the result containers with BeautifulSoup's html.parser."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    tag, cls = _split_selector(spec["results"])
+    # The strainer sees the raw class attribute while parsing, so match on its tokens
+    strainer = SoupStrainer(tag, class_=lambda value: not cls or bool(
+        value and cls in (value.split() if isinstance(value, str) else value)
+    ))
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+    results = []
+    seen = set()
+    for container in soup.select(spec["results"]):
+        link_elem = container.select_one(spec["link"])
+        if not link_elem or 'href' not in link_elem.attrs:
+            continue
+        title_elem = container.select_one(spec["title"]) if spec.get("title") else link_elem
+        result = _make_result(spec, link_elem['href'], title_elem.text if title_elem else None)
+        # Nested containers yield the same link twice
+        if result and result['link'] not in seen:
+            seen.add(result['link'])
+            results.append(result)
+            if len(results) >= limit:
+                break
+    return results
+
+def extract_results(engine, html, limit=None):
+    """Extract up to `limit` results (default: one engine page) using the engine's selectors."""
+    spec = get_engine(engine)
+    limit = limit or spec["page_size"]
+    if LXML_AVAILABLE:
+        try:
+            with tracer.span("parse", backend="lxml"):
+                return _extract_with_lxml(spec, html, limit)
+        except Exception as e:
+            logger.warning(f"lxml extraction failed, falling back to BeautifulSoup: {str(e)}")
+    with tracer.span("parse", backend="bs4"):
+        return _extract_with_bs4(spec, html, limit)
+
+def engine_origins():
+    """Return the scheme://host[:port] origin of every search engine URL."""
+    origins = []
+    for engine in SEARCH_ENGINES:
+        parts = urlsplit(engine["url"])
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in origins:
+            origins.append(origin)
+    return origins
+
+class BrowserPool:
+    """Bounded pool of warm headless Chrome instances, leased one search at a time."""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, lease_timeout=BROWSER_LEASE_TIMEOUT):
+        self.size = size
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._live = set()
+        self._leased = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "leases": 0,
+            "launches": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+            "lease_total": 0.0,
+            "lease_max": 0.0
+        }
+
+    def _launch(self):
+        """Start a new headless Chrome instance."""
+        chrome_options = webdriver.ChromeOptions()
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument(f"user-agent={DEFAULT_USER_AGENT}")
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
-            
+        if BROWSER_LIGHT_PROFILE:
+            # Return from driver.get() once the DOM is ready instead of waiting for every subresource
+            chrome_options.page_load_strategy = 'eager'
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2
+            })
+
         # Set random user agent
-        ua = UserAgent()
-        chrome_options.add_argument(f'user-agent={ua.random}')
-            
-        # Set proxy if available
+        chrome_options.add_argument(f'user-agent={user_agents.random()}')
+
+        # Set proxy if available (fixed for the lifetime of the instance)
         proxy = get_random_proxy()
         if proxy:
             chrome_options.add_argument(f'--proxy-server={proxy}')
-            
-        # Initialize the driver
+
         driver = webdriver.Chrome(options=chrome_options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
+        if BROWSER_LIGHT_PROFILE:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BROWSER_BLOCKED_URLS})
+        with self._lock:
+            self._stats["launches"] += 1
+
         # Add random delay to mimic human behavior
         time.sleep(random.uniform(1, 3))
-            
-        # Navigate to search engine
-        url = get_search_url(engine, query)
-        driver.get(url)
-            
-        # Wait for results to load
-        if engine.lower() == "google":
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'div.g'))
-            )
-                
-            # Extract results
-            results = []
-            elements = driver.find_elements(By.CSS_SELECTOR, 'div.g')
-                
-            for element in elements:
+        return {"driver": driver, "uses": 0}
+
+    def _reset(self, entry):
+        """Close extra tabs and clear cookies/storage so the next lease starts clean."""
+        driver = entry["driver"]
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        # Storage can only be cleared per origin, and searches only ever visit the engines
+        for origin in engine_origins():
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get("about:blank")
+
+    def _discard(self, entry):
+        """Quit a browser instance and forget about it."""
+        with self._lock:
+            self._live.discard(id(entry))
+        try:
+            entry["driver"].quit()
+        except Exception as e:
+            logger.debug(f"Error quitting browser: {str(e)}")
+
+    @contextmanager
+    def lease(self):
+        """Lease a browser for one search, launching or recycling instances as needed."""
+        if self._closed:
+            raise RuntimeError("Browser pool is shut down")
+
+        wait_start = time.monotonic()
+        with tracer.span("lease"):
+            if not self._slots.acquire(timeout=self.lease_timeout):
+                raise TimeoutError(f"No browser available after {self.lease_timeout} seconds")
+        waited = time.monotonic() - wait_start
+        with self._lock:
+            self._leased += 1
+
+        entry = None
+        lease_start = time.monotonic()
+        try:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                with tracer.span("launch"):
+                    entry = self._launch()
+                with self._lock:
+                    self._live.add(id(entry))
+
+            with self._lock:
+                self._stats["leases"] += 1
+                self._stats["wait_total"] += waited
+                self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+
+            yield entry["driver"]
+        finally:
+            if entry is not None:
+                entry["uses"] += 1
+                if self._closed:
+                    self._discard(entry)
+                elif entry["uses"] >= self.max_uses:
+                    with self._lock:
+                        self._stats["recycled"] += 1
+                    self._discard(entry)
+                else:
+                    try:
+                        self._reset(entry)
+                        self._idle.put(entry)
+                    except Exception as e:
+                        # The browser crashed or hung; replace it on the next lease
+                        logger.warning(f"Discarding broken browser: {str(e)}")
+                        with self._lock:
+                            self._stats["discarded"] += 1
+                        self._discard(entry)
+
+                held = time.monotonic() - lease_start
+                with self._lock:
+                    self._stats["lease_total"] += held
+                    self._stats["lease_max"] = max(self._stats["lease_max"], held)
+            with self._lock:
+                self._leased -= 1
+            self._slots.release()
+
+    def available(self):
+        """Return True if a lease would not have to wait for a browser."""
+        with self._lock:
+            return self._leased < self.size
+
+    def stats(self):
+        """Return a snapshot of pool usage, including wait and lease times."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["live"] = len(self._live)
+        stats["idle"] = self._idle.qsize()
+        leases = stats["leases"] or 1
+        stats["wait_avg"] = stats["wait_total"] / leases
+        stats["lease_avg"] = stats["lease_total"] / leases
+        return stats
+
+    def shutdown(self):
+        """Quit every browser in the pool."""
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(entry)
+        logger.info("Browser pool shut down")
+
+browser_pool = BrowserPool()
+
+# Collects every result on the page in one WebDriver round trip
+EXTRACT_RESULTS_SCRIPT = """
+var spec = arguments[0], out = [];
+var containers = document.querySelectorAll(spec.results);
+for (var i = 0; i < containers.length; i++) {
+    var link = containers[i].querySelector(spec.link);
+    if (!link) continue;
+    var title = spec.title ? containers[i].querySelector(spec.title) : link;
+    out.push([link.href, title ? title.innerText : null]);
+}
+return out;
+"""
+
+def search_with_selenium(query: str, engine="Google", page=0, timeout=SEARCH_TIMEOUT_MAX, cancel=None) -> list:
+    """Search using a pooled Selenium WebDriver; setting the `cancel` event abandons the search early."""
+    engine = get_engine(engine)["name"]
+    started = time.monotonic()
+    results = []
+    cancelled = cancel.is_set if cancel is not None else (lambda: False)
+    try:
+        with browser_pool.lease() as driver:
+            if cancelled():
+                return results
+
+            # Navigate to search engine
+            url = get_search_url(engine, query, page)
+            with tracer.span("navigate", engine=engine):
+                driver.get(url)
+
+            # Wait for results to load
+            spec = get_engine(engine)
+            loaded = EC.presence_of_element_located((selenium_by.By.CSS_SELECTOR, spec["results"]))
+            with tracer.span("wait", engine=engine):
+                selenium_ui.WebDriverWait(driver, timeout).until(lambda d: cancelled() or loaded(d))
+            if cancelled():
+                return results
+
+            # Extract all results in a single script call instead of several RPCs per result
+            parse_started = time.monotonic()
+            selectors = {key: spec.get(key) for key in ("results", "link", "title")}
+            seen = set()
+            with tracer.span("extract", engine=engine):
+                rows = driver.execute_script(EXTRACT_RESULTS_SCRIPT, selectors)
+            for link, title in rows:
+                result = _make_result(spec, link, title)
+                if result and result['link'] not in seen:
+                    seen.add(result['link'])
+                    results.append(result)
+                    if len(results) >= spec["page_size"]:
+                        break
+
+            metrics.observe("dorker_parse_seconds", time.monotonic() - parse_started, engine=engine)
+            if SERP_ARCHIVE_DIR:
+                # Only fetch the rendered page when it will be kept
+                archive_page(engine, query, page, url, "selenium", driver.page_source, len(results))
+            return results
+    except Exception as e:
+        logger.error(f"Selenium search error: {str(e)}")
+        metrics.inc("dorker_search_errors_total", engine=engine, method="selenium")
+        raise SearchFailed(str(e) or type(e).__name__) from e
+    finally:
+        metrics.observe("dorker_search_seconds", time.monotonic() - started, engine=engine, method="selenium")
+        metrics.observe("dorker_search_results", len(results), engine=engine, method="selenium")
+
+class ResultCache:
+    """TTL + LRU cache of search results, optionally backed by SQLite or a shared store."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, db_path=CACHE_DB, store=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, results TEXT NOT NULL)"
+                )
+                self._db.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+                self._db.commit()
+            except Exception as e:
+                logger.error(f"Error opening result cache database: {str(e)}")
+                self._db = None
+
+    @staticmethod
+    def make_key(engine, query, page=0):
+        """Build the cache key for an engine, query and result page."""
+        key = f"{engine.lower()}|{parse_dork(query).key()}"
+        return f"{key}|{page}" if page else key
+
+    def get(self, engine, query, page=0):
+        """Return cached results, or None on a miss."""
+        key = self.make_key(engine, query, page)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+        if self.store is not None:
+            try:
+                shared = self.store.get(f"cache:{key}")
+            except Exception as e:
+                logger.error(f"Error reading shared result cache: {str(e)}")
+                shared = None
+            with self._lock:
+                if shared:
+                    self._store(key, shared["expires_at"], shared["results"])
+                    self.hits += 1
+                    return shared["results"]
+                self.misses += 1
+                return None
+
+        with self._lock:
+            if self._db is not None:
                 try:
-                    title_element = element.find_element(By.CSS_SELECTOR, 'h3')
-                    link_element = element.find_element(By.CSS_SELECTOR, 'a')
-                        
-                    title = title_element.text
-                    link = link_element.get_attribute('href')
-                        
-                    if link and link.startswith('http') and 'google.com' not in link:
-                        results.append({
-                            'title': title,
-                            'link': link
-                        })
+                    row = self._db.execute(
+                        "SELECT expires_at, results FROM results WHERE key = ? AND expires_at > ?",
+                        (key, now)
+                    ).fetchone()
                 except Exception as e:
-                    logger.debug(f"Error extracting result: {str(e)}")
-                    continue
-                
-            return results
-        elif engine.lower() == "bing":
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'li.b_algo'))
-            )
-                
-            results = []
-            elements = driver.find_elements(By.CSS_SELECTOR, 'li.b_algo')
-                
-            for element in elements:
+                    logger.error(f"Error reading result cache: {str(e)}")
+                    row = None
+                if row:
+                    results = json.loads(row[1])
+                    self._store(key, row[0], results)
+                    self.hits += 1
+                    return results
+
+            self.misses += 1
+            return None
+
+    def contains(self, engine, query, page=0):
+        """Return True if fresh results are cached, without touching hit/miss counts."""
+        key = self.make_key(engine, query, page)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                return True
+        if self.store is not None:
+            try:
+                return self.store.get(f"cache:{key}") is not None
+            except Exception as e:
+                logger.error(f"Error reading shared result cache: {str(e)}")
+                return False
+        if self._db is not None:
+            with self._lock:
                 try:
-                    link_element = element.find_element(By.CSS_SELECTOR, 'h2 a')
-                    title = link_element.text
-                    link = link_element.get_attribute('href')
-                        
-                    if link and link.startswith('http'):
-                        results.append({
-                            'title': title,
-                            'link': link
-                        })
+                    row = self._db.execute(
+                        "SELECT 1 FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+                    ).fetchone()
                 except Exception as e:
-                    logger.debug(f"Error extracting Bing result: {str(e)}")
-                    continue
-                
-            return results
-        elif engine.lower() == "duckduckgo":
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '.result__a'))
-            )
-                
-            results = []
-            elements = driver.find_elements(By.CSS_SELECTOR, '.result')
-                
-            for element in elements:
+                    logger.error(f"Error reading result cache: {str(e)}")
+                    row = None
+            return row is not None
+        return False
+
+    def set(self, engine, query, results, page=0):
+        """Cache results for an engine, query and result page."""
+        key = self.make_key(engine, query, page)
+        expires_at = time.time() + self.ttl
+        if self.store is not None:
+            try:
+                self.store.set(f"cache:{key}", {"expires_at": expires_at, "results": results}, ttl=self.ttl)
+            except Exception as e:
+                logger.error(f"Error writing shared result cache: {str(e)}")
+        with self._lock:
+            self._store(key, expires_at, results)
+            if self._db is not None:
                 try:
-                    link_element = element.find_element(By.CSS_SELECTOR, '.result__a')
-                    title = link_element.text
-                    link = link_element.get_attribute('href')
-                        
-                    if link and link.startswith('http'):
-                        results.append({
-                            'title': title,
-                            'link': link
-                        })
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, expires_at, results) VALUES (?, ?, ?)",
+                        (key, expires_at, json.dumps(results))
+                    )
+                    self._db.commit()
                 except Exception as e:
-                    logger.debug(f"Error extracting DuckDuckGo result: {str(e)}")
-                    continue
-                
-            return results
+                    logger.error(f"Error writing result cache: {str(e)}")
+
+    def _store(self, key, expires_at, results):
+        self._entries[key] = (expires_at, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counts and the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+result_cache = ResultCache()
+
+# Compression codecs for archived pages: (file suffix, compress, decompress)
+ARCHIVE_CODECS = {
+    "zlib": (".z", functools.partial(zlib.compress, level=6), zlib.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress)
+}
+
+class SerpArchive:
+    """Compressed, content-addressed store of fetched result pages with an SQLite index.
+
+    Each page body is stored once under its SHA-256, however many searches returned it;
+    the index records every fetch by engine, query, page and time.
+    """
+
+    def __init__(self, root=SERP_ARCHIVE_DIR, codec=SERP_ARCHIVE_CODEC):
+        if codec not in ARCHIVE_CODECS:
+            raise ValueError(f"Unknown SERP_ARCHIVE_CODEC: {codec}")
+        self.root = root
+        self.codec = codec
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "digest TEXT PRIMARY KEY, codec TEXT NOT NULL, size INTEGER NOT NULL, "
+                "stored_size INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "id INTEGER PRIMARY KEY, engine TEXT NOT NULL, query TEXT NOT NULL, page INTEGER NOT NULL, "
+                "url TEXT NOT NULL, method TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "results INTEGER NOT NULL, digest TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS pages_by_query ON pages (engine, query, fetched_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS pages_by_time ON pages (fetched_at)")
+
+    @staticmethod
+    def object_path(root, digest, codec):
+        # Two-character fan-out keeps directories small
+        return os.path.join(root, "objects", digest[:2], digest + ARCHIVE_CODECS[codec][0])
+
+    def put(self, engine, query, page, url, method, html, results, fetched_at=None):
+        """Archive one fetched page; returns True if its content was not stored before."""
+        data = html.encode("utf-8", errors="replace")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone()
+        stored_size = 0
+        if not known:
+            blob = ARCHIVE_CODECS[self.codec][1](data)
+            stored_size = len(blob)
+            path = self.object_path(self.root, digest, self.codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers (and other processes) never see a partial object
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        with self._lock, self._db:
+            if not known:
+                self._db.execute(
+                    "INSERT OR IGNORE INTO objects (digest, codec, size, stored_size) VALUES (?, ?, ?, ?)",
+                    (digest, self.codec, len(data), stored_size)
+                )
+            self._db.execute(
+                "INSERT INTO pages (engine, query, page, url, method, fetched_at, results, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (engine, query, page, url, method, fetched_at or time.time(), results, digest)
+            )
+        return not known
+
+    @classmethod
+    def load(cls, root, digest, codec):
+        """Read an archived page back as text."""
+        with open(cls.object_path(root, digest, codec), "rb") as f:
+            return ARCHIVE_CODECS[codec][2](f.read()).decode("utf-8")
+
+    def read(self, digest):
+        with self._lock:
+            row = self._db.execute("SELECT codec FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return self.load(self.root, digest, row[0])
+
+    def find(self, engine=None, query=None, since=None, until=None):
+        """Return archived fetches, oldest first, optionally filtered by engine, exact query and time range."""
+        clauses, params = [], []
+        for clause, value in (("p.engine = ?", engine), ("p.query = ?", query),
+                              ("p.fetched_at >= ?", since), ("p.fetched_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = (
+            "SELECT p.id, p.engine, p.query, p.page, p.url, p.method, p.fetched_at, p.results, p.digest, o.codec "
+            "FROM pages p JOIN objects o ON o.digest = p.digest"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY p.fetched_at", params).fetchall()
+        keys = ("id", "engine", "query", "page", "url", "method", "fetched_at", "results", "digest", "codec")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            objects, size, stored_size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM objects"
+            ).fetchone()
+        return {"pages": pages, "objects": objects, "bytes": size, "stored_bytes": stored_size}
+
+serp_archive = None
+# Compresses and writes archived pages off the search path
+archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serp-archive")
+
+def get_serp_archive():
+    """Open the SERP archive on first use; None when SERP_ARCHIVE_DIR is not set."""
+    global serp_archive
+    if serp_archive is None and SERP_ARCHIVE_DIR:
+        serp_archive = SerpArchive()
+    return serp_archive
+
+def _archive_page(engine, query, page, url, method, html, results):
+    try:
+        new = get_serp_archive().put(engine, query, page, url, method, html, results)
+        metrics.inc("dorker_archive_pages_total", engine=engine, content="new" if new else "duplicate")
+    except Exception as e:
+        logger.error(f"Error archiving result page: {str(e)}")
+
+def archive_page(engine, query, page, url, method, html, results):
+    """Queue a fetched result page for the SERP archive, if one is configured."""
+    if not SERP_ARCHIVE_DIR:
+        return
+    # The archive is opened and written on its single worker thread
+    archive_executor.submit(_archive_page, engine, query, page, url, method, html, results)
+
+class SearchLane:
+    """Bounded queue of search jobs served by a fixed set of worker threads."""
+
+    def __init__(self, name, workers, max_queue=SEARCH_QUEUE_SIZE):
+        self.name = name
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "running": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0
+        }
+
+    def full(self):
+        """Return True if no more jobs can be queued."""
+        return self._queue.full()
+
+    def submit(self, func, *args):
+        """Queue a job and return its 1-based queue position; raises queue.Full when full."""
+        try:
+            # The job runs in a copy of the caller's context so it finishes the caller's trace
+            self._queue.put_nowait((time.monotonic(), func, args, contextvars.copy_context()))
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            metrics.inc("dorker_queue_rejections_total", lane=self.name)
+            raise
+        with self._lock:
+            self._stats["submitted"] += 1
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            enqueued, func, args, ctx = job
+            waited = time.monotonic() - enqueued
+            metrics.observe("dorker_queue_wait_seconds", waited, lane=self.name)
+            with self._lock:
+                self._stats["running"] += 1
+                self._stats["wait_total"] += waited
+                self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+            try:
+                ctx.run(run_traced, func, args, func.__name__, waited)
+            except Exception as e:
+                logger.error(f"Search job failed in {self.name} lane: {str(e)}")
+            finally:
+                with self._lock:
+                    self._stats["running"] -= 1
+                    self._stats["completed"] += 1
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-search-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the workers once they finish their current job; queued jobs are dropped."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def stats(self):
+        """Return queue depth, running jobs and wait times."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["depth"] = self._queue.qsize()
+        started = stats["completed"] + stats["running"]
+        stats["wait_avg"] = stats["wait_total"] / started if started else 0.0
+        return stats
+
+user_lane = SearchLane("user", SEARCH_WORKERS)
+admin_lane = SearchLane("admin", ADMIN_SEARCH_WORKERS)
+
+# Jobs a worker process may run when they arrive through the shared store
+SHARED_JOBS = ('run_dork', 'run_fanout', 'run_batch', 'run_page')
+
+def encode_job_arg(value):
+    """Make a job argument JSON-safe; Telegram objects travel as their dicts."""
+    from telegram import Bot, TelegramObject
+
+    if isinstance(value, Bot):
+        return {"__bot__": True}
+    if isinstance(value, TelegramObject):
+        return {"__telegram__": type(value).__name__, "data": value.to_dict()}
+    return value
+
+def decode_job_arg(value, bot):
+    """Rebuild a job argument encoded by encode_job_arg, bound to this process's bot."""
+    import telegram
+
+    if isinstance(value, dict):
+        if value.get("__bot__"):
+            return bot
+        if "__telegram__" in value:
+            return getattr(telegram, value["__telegram__"]).de_json(value["data"], bot)
+    return value
+
+class SharedLane:
+    """Search lane whose queue lives in the shared store, served by worker processes on any host."""
+
+    def __init__(self, name, workers, max_queue=SHARED_QUEUE_SIZE):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.bot = None
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "running": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0
+        }
+
+    def depth(self):
+        """Return the number of jobs waiting across all processes."""
+        try:
+            return get_shared_store().depth(self.name)
+        except Exception as e:
+            logger.error(f"Error reading {self.name} lane depth: {str(e)}")
+            return 0
+
+    def full(self):
+        """Return True if no more jobs can be queued."""
+        return self.depth() >= self.max_queue
+
+    def submit(self, func, *args):
+        """Queue a job for the workers and return its 1-based queue position; raises queue.Full when full."""
+        if func.__name__ not in SHARED_JOBS:
+            raise ValueError(f"{func.__name__} cannot run on a shared lane")
+        if self.full():
+            with self._lock:
+                self._stats["rejected"] += 1
+            metrics.inc("dorker_queue_rejections_total", lane=self.name)
+            raise queue.Full
+        get_shared_store().push(self.name, {
+            "func": func.__name__,
+            "args": [encode_job_arg(arg) for arg in args],
+            "enqueued": time.time()
+        })
+        with self._lock:
+            self._stats["submitted"] += 1
+        return self.depth()
+
+    def _work(self):
+        store = get_shared_store()
+        while not self._stop.is_set():
+            try:
+                job = store.pop(self.name, timeout=1)
+            except Exception as e:
+                logger.error(f"Error reading the {self.name} lane: {str(e)}")
+                self._stop.wait(1)
+                continue
+            if job is None:
+                continue
+            waited = max(0.0, time.time() - job["enqueued"])
+            metrics.observe("dorker_queue_wait_seconds", waited, lane=self.name)
+            with self._lock:
+                self._stats["running"] += 1
+                self._stats["wait_total"] += waited
+                self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+            try:
+                if job["func"] not in SHARED_JOBS:
+                    raise ValueError(f"unknown job {job['func']}")
+                args = [decode_job_arg(arg, self.bot) for arg in job["args"]]
+                contextvars.copy_context().run(run_traced, globals()[job["func"]], args, job["func"], waited)
+            except Exception as e:
+                logger.error(f"Search job failed in shared {self.name} lane: {str(e)}")
+            finally:
+                with self._lock:
+                    self._stats["running"] -= 1
+                    self._stats["completed"] += 1
+
+    def start(self, bot):
+        """Start the worker threads; replies go out through bot."""
+        self.bot = bot
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-shared-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the workers once they finish their current job; queued jobs stay for other workers."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def stats(self):
+        """Return queue depth, running jobs and wait times."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["depth"] = self.depth()
+        started = stats["completed"] + stats["running"]
+        stats["wait_avg"] = stats["wait_total"] / started if started else 0.0
+        return stats
+
+shared_user_lane = SharedLane("user", SEARCH_WORKERS)
+shared_admin_lane = SharedLane("admin", ADMIN_SEARCH_WORKERS)
+
+def active_lanes():
+    """Return the (user, admin) lanes this process queues searches on."""
+    if BOT_ROLE == 'intake':
+        return shared_user_lane, shared_admin_lane
+    return user_lane, admin_lane
+
+def search_lane(user_id):
+    """Pick the lane for a user's searches."""
+    user, admin = active_lanes()
+    return admin if is_admin(user_id) else user
+
+metrics.callback(
+    "dorker_queue_depth", "Searches waiting in each lane.",
+    lambda: {(("lane", lane.name),): lane.stats()["depth"] for lane in active_lanes()}
+)
+metrics.callback(
+    "dorker_queue_running", "Searches currently running in each lane.",
+    lambda: {(("lane", lane.name),): lane.stats()["running"] for lane in active_lanes()}
+)
+metrics.callback(
+    "dorker_cache_lookups_total", "Result cache lookups by outcome.",
+    lambda: {(("result", k),): v for k, v in result_cache.stats().items() if k in ("hits", "misses")},
+    kind="counter"
+)
+metrics.callback(
+    "dorker_browser_pool", "Browser pool instances by state.",
+    lambda: {(("state", k),): v for k, v in browser_pool.stats().items() if k in ("live", "idle")}
+)
+
+# Caps concurrent outbound searches per engine across both lanes
+engine_slots = {e["name"].lower(): threading.BoundedSemaphore(ENGINE_CONCURRENCY) for e in SEARCH_ENGINES}
+
+class HedgeBudget:
+    """Caps hedged Selenium searches at a fraction of recent searches so browser load stays bounded."""
+
+    def __init__(self, max_rate=HEDGE_MAX_RATE, window=HEDGE_WINDOW):
+        self.max_rate = max_rate
+        self.window = window
+        self._searches = deque()
+        self._hedges = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        for log in (self._searches, self._hedges):
+            while log and log[0] <= now - self.window:
+                log.popleft()
+
+    def note_search(self):
+        """Count a search that could be hedged."""
+        with self._lock:
+            self._searches.append(time.monotonic())
+
+    def allow(self):
+        """Take a hedge if the rate allows it and a browser is free right away."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            # Always allow one hedge per window so quiet periods still get tail protection
+            if len(self._hedges) >= max(1, self.max_rate * len(self._searches)):
+                return False
+            if not browser_pool.available():
+                return False
+            self._hedges.append(now)
+            return True
+
+    def stats(self):
+        """Return searches and hedges started in the current window."""
+        with self._lock:
+            self._trim(time.monotonic())
+            return {"searches": len(self._searches), "hedges": len(self._hedges)}
+
+hedge_budget = HedgeBudget()
+# Runs hedged searches: an HTTP search (blocking client only) plus a Selenium search per engine slot
+hedge_executor = ThreadPoolExecutor(
+    max_workers=2 * ENGINE_CONCURRENCY * len(SEARCH_ENGINES), thread_name_prefix="hedge"
+)
+
+def hedge_delay(engine, page):
+    """Return how long to wait before hedging a search, or None if it should not be hedged."""
+    if not HEDGE_SELENIUM or page != 0:
+        return None
+    if not (engine_health.is_closed(engine, "requests") and engine_health.is_closed(engine, "selenium")):
+        return None
+    return engine_health.percentile(engine, "requests", HEDGE_PERCENTILE)
+
+def submit_requests(query, engine, page, timeout):
+    """Start the HTTP search method; returns a future (cancellable on the async core)."""
+    if ASYNC_SEARCH:
+        return async_core.submit(async_search(query, engine, page, timeout))
+    return submit_in_context(hedge_executor, functools.partial(search_with_requests, timeout=timeout), query, engine, page)
+
+def future_results(future, timeout=None):
+    """Return a search future's results, or [] if it failed, was cancelled or ran out of time."""
+    try:
+        return future.result(timeout) or []
     except Exception as e:
-        logger.error(f"Selenium search error: {str(e)}")
+        if not future.cancelled():
+            logger.error(f"Search failed: {str(e) or type(e).__name__}")
+        future.cancel()
+        return []
+
+def future_outcome(future, started, timeout=None):
+    """Return (results, (latency, status)) for a finished search future; status is ok, empty or failed."""
+    results = future_results(future, timeout)
+    latency = time.monotonic() - started
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return results, (latency, "failed")
+    return results, (latency, "ok" if results else "empty")
+
+def hedged_selenium(query, engine, page, cancel):
+    """Selenium side of a hedge; its health is only recorded if it was not cancelled."""
+    started = time.monotonic()
+    try:
+        results = search_with_selenium(query, engine, page, timeout=engine_health.timeout(engine, "selenium"), cancel=cancel)
+    except SearchFailed:
+        if not cancel.is_set():
+            engine_health.record(engine, "selenium", time.monotonic() - started, False)
+        raise
+    if not cancel.is_set():
+        engine_health.record(engine, "selenium", time.monotonic() - started, True)
+    return results
+
+def record_late_requests(engine, started, future):
+    """Record an HTTP search that finished after Selenium had already won its hedge."""
+    if future.cancelled():
+        return
+    success = future.exception() is None and bool(future.result())
+    engine_health.record(engine, "requests", time.monotonic() - started, success)
+
+def hedged_search(query, engine, page, delay):
+    """Run the HTTP search and, once it takes longer than `delay`, Selenium alongside it.
+
+    The first method to return results wins and the other is cancelled. Returns
+    (results, hedged, outcome): hedged tells whether Selenium has already been tried,
+    and outcome is the HTTP search's (latency, status) for its health record, or None
+    if it had not finished when Selenium won (it is then recorded when it does).
+    """
+    name = get_engine(engine)["name"]
+    timeout = engine_health.timeout(engine, "requests")
+    hedge_budget.note_search()
+    started = time.monotonic()
+    primary = submit_requests(query, engine, page, timeout)
+
+    done, _ = wait([primary], timeout=delay)
+    if done or not hedge_budget.allow():
+        # Allow a little slack over the request deadline before cancelling
+        results, outcome = future_outcome(primary, started, timeout + 1)
+        return results, False, outcome
+
+    metrics.inc("dorker_hedges_total", engine=name)
+    cancel = threading.Event()
+    hedge = submit_in_context(hedge_executor, hedged_selenium, query, engine, page, cancel)
+    outcome = None
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future is primary:
+                results, outcome = future_outcome(primary, started)
+            else:
+                results = future_results(future)
+            if results:
+                cancel.set()
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge and outcome is None:
+                    primary.add_done_callback(functools.partial(record_late_requests, engine, started))
+                elif future is hedge and outcome[1] == "empty":
+                    # Selenium found results the HTTP page did not show: broken markup, not a zero-hit dork
+                    outcome = (outcome[0], "failed")
+                metrics.inc("dorker_hedge_wins_total", engine=name, method="selenium" if future is hedge else "requests")
+                return results, True, outcome
+    return [], True, outcome
+
+def run_search(query, engine, on_fallback=None, page=0, fresh=False):
+    """Search an engine through the result cache, falling back to Selenium on failure.
+
+    fresh=True skips the cache lookup (the new results are still cached).
+    """
+    # An engine that cannot express the query would only return an empty page and trigger the fallback
+    try:
+        compile_query(query, engine)
+    except UnsupportedQuery as e:
+        logger.info(f"Skipping search: {str(e)}")
+        metrics.inc("dorker_unsupported_queries_total", engine=get_engine(engine)["name"])
         return []
+
+    with tracer.span("cache", engine=engine, page=page) as span:
+        cached = None if fresh else result_cache.get(engine, query, page)
+        span["hit"] = cached is not None
+    if cached is not None:
+        return cached
+
+    results = []
+    hedged = False
+    # (latency, ok|empty|failed) of the HTTP attempt, recorded once Selenium has had its say
+    outcome = None
+
+    slot = engine_slots[get_engine(engine)["name"].lower()]
+    with tracer.span("slot", engine=engine):
+        slot.acquire()
+    try:
+        # Health is only recorded for first pages (an empty later page is expected), so later
+        # pages follow the circuit without taking its half-open probe
+        allow = engine_health.allow if page == 0 else engine_health.is_closed
+
+        # Method 1: Using requests with custom headers (skipped while its circuit is open)
+        delay = hedge_delay(engine, page)
+        if delay is not None and engine_health.allow(engine, "requests"):
+            # Start Selenium early if this request is slower than usual
+            with tracer.span("hedge", engine=engine, after=f"{delay:.2f}s"):
+                results, hedged, outcome = hedged_search(query, engine, page, delay)
+        elif allow(engine, "requests"):
+            started = time.monotonic()
+            status = "failed"
+            try:
+                with tracer.span("requests", engine=engine, page=page):
+                    results = fetch_with_requests(query, engine, page, timeout=engine_health.timeout(engine, "requests"))
+                status = "ok" if results else "empty"
+            except Exception as e:
+                logger.error(f"Requests search failed: {str(e)}")
+            outcome = (time.monotonic() - started, status)
+        else:
+            metrics.inc("dorker_circuit_skips_total", engine=get_engine(engine)["name"], method="requests")
+
+        # Method 2: Using Selenium as a last resort (an empty later page usually just means no more results)
+        if not results and page == 0 and not hedged:
+            if not engine_health.allow(engine, "selenium"):
+                metrics.inc("dorker_circuit_skips_total", engine=get_engine(engine)["name"], method="selenium")
+            else:
+                metrics.inc("dorker_selenium_fallbacks_total", engine=get_engine(engine)["name"])
+                if on_fallback:
+                    on_fallback()
+                started = time.monotonic()
+                failed = False
+                try:
+                    with tracer.span("selenium", engine=engine):
+                        results = search_with_selenium(query, engine, page, timeout=engine_health.timeout(engine, "selenium"))
+                except Exception as e:
+                    logger.error(f"Selenium search failed: {str(e)}")
+                    failed = True
+                engine_health.record(engine, "selenium", time.monotonic() - started, not failed)
+                if results and outcome is not None and outcome[1] == "empty":
+                    # Selenium found results the HTTP page did not show: broken markup, not a zero-hit dork
+                    outcome = (outcome[0], "failed")
     finally:
-        if driver:
-            driver.quit()
-    
+        slot.release()
+        if outcome is not None and page == 0:
+            engine_health.record(engine, "requests", outcome[0], outcome[1] != "failed")
+
+    if results:
+        result_cache.set(engine, query, results, page)
+    return results
+
+# Query parameters that never change which page a link points to
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref"}
+# Prefixes of whole families of tracking parameters
+TRACKING_PREFIXES = ("utm_",)
+
+def canonicalize_url(url):
+    """Reduce a URL to a canonical form for deduplication."""
+    try:
+        parts = urlsplit(url.strip())
+        # .port raises ValueError for a malformed port such as "host:abc"
+        port = parts.port
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip('/') or '/'
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    # http and https copies of a page count as the same result
+    return urlunsplit(('', host, path, urlencode(params), ''))
+
+def merge_results(merged, seen, engine, results):
+    """Append results not already in `merged`, tagging each with the engine that found it (if given)."""
+    added = 0
+    for result in results:
+        key = canonicalize_url(result['link'])
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(dict(result, engine=engine) if engine else result)
+        added += 1
+    return added
+
+fanout_executor = ThreadPoolExecutor(
+    max_workers=(SEARCH_WORKERS + ADMIN_SEARCH_WORKERS) * len(SEARCH_ENGINES),
+    thread_name_prefix="fanout"
+)
+
+def search_all_engines(query, on_update=None):
+    """Query every engine concurrently, merging results as each one finishes.
+
+    on_update(merged, counts, done) is called after each engine completes, where counts maps
+    engine name to the number of results it returned.
+    """
+    futures = {
+        submit_in_context(fanout_executor, run_search, query, engine): engine
+        for engine in supported_engines(query)
+    }
+    merged = []
+    seen = set()
+    counts = {}
+    for future in as_completed(futures):
+        engine = futures[future]
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"Fan-out search on {engine} failed: {str(e)}")
+            results = []
+        counts[engine] = len(results)
+        merge_results(merged, seen, engine, results)
+        if on_update:
+            on_update(merged, counts, len(counts) == len(futures))
+    return merged
+
+def format_results(dork_query, engine, results, footer="", start=1):
+    """Format results as a message, staying under Telegram's length limit."""
+    header = f"Results for: {dork_query}\nEngine: {engine}\n\n"
+    parts = [header]
+    length = len(header) + len(footer)
+    for i, result in enumerate(results, start):
+        source = f" [{result['engine']}]" if result.get('engine') else ""
+        entry = f"{i}. {result['title']}{source}\n{result['link']}\n\n"
+        if length + len(entry) > MESSAGE_LIMIT:
+            break
+        parts.append(entry)
+        length += len(entry)
+    parts.append(footer)
+    return "".join(parts)
+
+class ResultPager:
+    """Lazily fetched result list for one query that prefetches the next engine page while it is paged."""
+
+    def __init__(self, user_id, query, engine, session_id=None):
+        self.id = session_id or os.urandom(4).hex()
+        self.user_id = user_id
+        self.query = query
+        self.engine = engine
+        self.results = []
+        self.last_used = time.monotonic()
+        self._seen = set()
+        self._next_page = 0
+        self._exhausted = False
+        self._prefetch = None
+        self._lock = threading.Lock()
+
+    def _fetch_next(self, on_fallback=None):
+        """Fetch the next engine page; must be called with the lock held."""
+        if self._exhausted:
+            return
+        page = self._next_page
+        results = run_search(self.query, self.engine, on_fallback=on_fallback, page=page)
+        self._next_page += 1
+        added = merge_results(self.results, self._seen, None, results)
+        # Stop once the engine runs dry or starts repeating itself
+        if not added or self._next_page >= PAGER_MAX_PAGES:
+            self._exhausted = True
+
+    def _prefetch_next(self):
+        with self._lock:
+            try:
+                self._fetch_next()
+            except Exception as e:
+                logger.error(f"Prefetch failed: {str(e)}")
+
+    def get_page(self, number, on_fallback=None):
+        """Return (results on message page `number`, whether a later page exists)."""
+        self.last_used = time.monotonic()
+        end = (number + 1) * DISPLAY_LIMIT
+        with self._lock:
+            # Fetch synchronously only what this message page itself needs
+            while len(self.results) < end and not self._exhausted:
+                self._fetch_next(on_fallback)
+            page_results = self.results[number * DISPLAY_LIMIT:end]
+            has_next = len(self.results) > end or not self._exhausted
+
+            # Once the user is paging, load the following message page while they read
+            # this one. The first page never prefetches: most searches are never paged.
+            if number > 0 and not self._exhausted and (self._prefetch is None or self._prefetch.done()):
+                if len(self.results) <= end + DISPLAY_LIMIT:
+                    self._prefetch = fanout_executor.submit(self._prefetch_next)
+        return page_results, has_next
+
+pager_sessions = {}
+pager_lock = threading.Lock()
+
+def sweep_pager_sessions(context=None):
+    """Release result sessions that have been idle longer than PAGER_IDLE_TIMEOUT."""
+    cutoff = time.monotonic() - PAGER_IDLE_TIMEOUT
+    with pager_lock:
+        for session_id in [k for k, v in pager_sessions.items() if v.last_used < cutoff]:
+            del pager_sessions[session_id]
+
+def save_pager(pager):
+    """Keep a result session for its paging buttons, sharing its query with other workers."""
+    sweep_pager_sessions()
+    with pager_lock:
+        pager_sessions[pager.id] = pager
+    store = get_shared_store()
+    if store is not None:
+        store.set(
+            f"pager:{pager.id}",
+            {"user_id": pager.user_id, "query": pager.query, "engine": pager.engine},
+            ttl=PAGER_IDLE_TIMEOUT
+        )
+
+def find_pager(session_id):
+    """Return a result session, rebuilding it from the shared store if another worker created it."""
+    with pager_lock:
+        pager = pager_sessions.get(session_id)
+    store = get_shared_store()
+    if pager is None and store is not None:
+        info = store.get(f"pager:{session_id}")
+        if info:
+            # Pages fetched elsewhere come back from the shared result cache
+            pager = ResultPager(info["user_id"], info["query"], info["engine"], session_id=session_id)
+            with pager_lock:
+                pager = pager_sessions.setdefault(session_id, pager)
+    return pager
+
+def page_markup(pager, number, has_next):
+    """Build the prev/next buttons for a result page."""
+    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+    buttons = []
+    if number > 0:
+        buttons.append(InlineKeyboardButton("« Prev", callback_data=f"page:{pager.id}:{number - 1}"))
+    if has_next:
+        buttons.append(InlineKeyboardButton("Next »", callback_data=f"page:{pager.id}:{number + 1}"))
+    return InlineKeyboardMarkup([buttons]) if buttons else None
+
+def format_page(pager, number, results):
+    """Format one message page of a paged search."""
+    start = number * DISPLAY_LIMIT + 1
+    footer = f"\nPage {number + 1} (results {start}-{start + len(results) - 1})"
+    return format_results(pager.query, pager.engine, results, footer, start=start)
+
+def unsupported_reason(query, engine):
+    """Explain why a query cannot run on an engine (or on any engine for All); None if it can."""
+    engines = supported_engines(query)
+    if engine == ALL_ENGINES:
+        return None if engines else "None of the search engines can run this query."
+    try:
+        compile_query(query, engine)
+    except UnsupportedQuery as e:
+        hint = f"\nTry a different search engine with: /engine {engines[0]}" if engines else ""
+        return f"{str(e)}.{hint}"
+    return None
+
 @admin_required
 def dork(update: Update, context: CallbackContext) -> None:
-    """Handle the /dork command."""
+    """Handle the /dork command by queueing the search."""
     user_id = update.effective_user.id
-        
-    # Check rate limit (admins are exempt)
-    if not is_admin(user_id) and not check_rate_limit(user_id):
-        remaining_time = get_remaining_time(user_id)
+    lane = search_lane(user_id)
+
+    # Reject up front when the queue is full so no rate limit slot is spent
+    if lane.full():
         update.message.reply_text(
-            f"Rate limit exceeded. You can make {RATE_LIMIT} searches per hour.\n"
-            f"Please try again in {remaining_time}."
+            f"The search queue is full ({lane.stats()['depth']} searches waiting).\n"
+            f"Please try again in a minute."
         )
         return
         
@@ -382,57 +2820,76 @@ def dork(update: Update, context: CallbackContext) -> None:
         update.message.reply_text('Please provide a dork query. Example: /dork intext:password filetype:txt')
         return
         
-    dork_query = ' '.join(context.args)
+    args = list(context.args)
+    fan_out = '--all' in args
+    if fan_out:
+        args.remove('--all')
+    if not args:
+        update.message.reply_text('Please provide a dork query. Example: /dork --all intext:password filetype:txt')
+        return
+
+    dork_query = ' '.join(args)
         
     # Get preferred search engine from user data or default to Google
-    engine = context.user_data.get('search_engine', 'Google')
-        
-    update.message.reply_text(f'Searching for: {dork_query}\nUsing engine: {engine}\nPlease wait...')
-        
-    # Try multiple search methods to avoid blocking
-    results = []
-        
-    # Method 1: Using requests with custom headers
-    try:
-        request_results = search_with_requests(dork_query, engine)
-        if request_results:
-            results = request_results
-    except Exception as e:
-        logger.error(f"Requests search failed: {str(e)}")
-        
-    # Method 2: Using Selenium as a last resort
-    if not results:
+    engine = get_engine_preference(context, user_id)
+    if fan_out or engine == ALL_ENGINES:
+        engine = ALL_ENGINES
+        job = run_fanout
+    else:
+        job = run_dork
+
+    # The queued job inherits this trace and records it once the results are sent
+    with tracer.begin("dork", query=dork_query, engine=engine):
+        with tracer.span("validate"):
+            # Reject queries the engine cannot express before a rate limit slot is spent
+            reason = unsupported_reason(dork_query, engine)
+            if reason:
+                update.message.reply_text(reason)
+                return
+
+            # Check rate limit (admins are exempt)
+            if not is_admin(user_id) and not check_rate_limit(user_id):
+                remaining_time = get_remaining_time(user_id)
+                update.message.reply_text(
+                    f"Rate limit exceeded. You can make {RATE_LIMIT} searches per hour.\n"
+                    f"Please try again in {remaining_time}."
+                )
+                return
+
         try:
-            update.message.reply_text("First method failed, trying alternative method...")
-            selenium_results = search_with_selenium(dork_query, engine)
-            if selenium_results:
-                results = selenium_results
-        except Exception as e:
-            logger.error(f"Selenium search failed: {str(e)}")
+            position = lane.submit(job, update, dork_query, engine)
+        except queue.Full:
+            update.message.reply_text("The search queue is full. Please try again in a minute.")
+            return
+
+        update.message.reply_text(
+            f'Searching for: {dork_query}\nUsing engine: {engine}\n'
+            f'Queue position: {position}\nPlease wait...'
+        )
+
+def run_dork(update: Update, dork_query, engine) -> None:
+    """Run a queued dork search and send the first page of results."""
+    pager = ResultPager(update.effective_user.id, dork_query, engine)
+
+    # Try multiple search methods to avoid blocking (cached results skip the engines)
+    with tracer.span("search"):
+        results, has_next = pager.get_page(
+            0,
+            on_fallback=lambda: update.message.reply_text("First method failed, trying alternative method...")
+        )
         
     # Send results
     if results:
-        # Format and send results
-        message = f"Results for: {dork_query}\nEngine: {engine}\n\n"
-            
-        # Limit to 10 results to avoid message length issues
-        limited_results = results[:10]
-            
-        for i, result in enumerate(limited_results, 1):
-            message += f"{i}. {result['title']}\n{result['link']}\n\n"
-            
-        if len(results) > 10:
-            message += f"\nShowing 10 of {len(results)} results."
-            
-        update.message.reply_text(message)
+        save_pager(pager)
+        with tracer.span("format"):
+            text = format_page(pager, 0, results)
+            markup = page_markup(pager, 0, has_next)
+        with tracer.span("send"):
+            update.message.reply_text(text, reply_markup=markup)
     else:
-        # Try another search engine if the first one failed
-        if engine.lower() == "google":
-            alt_engine = "Bing"
-        elif engine.lower() == "bing":
-            alt_engine = "DuckDuckGo"
-        else:
-            alt_engine = "Google"
+        # Suggest the next engine in the list if this one failed
+        index = SEARCH_ENGINES.index(get_engine(engine))
+        alt_engine = SEARCH_ENGINES[(index + 1) % len(SEARCH_ENGINES)]["name"]
                 
         update.message.reply_text(
             f"No results found for: {dork_query} using {engine}.\n"
@@ -440,6 +2897,450 @@ def dork(update: Update, context: CallbackContext) -> None:
             f"Try using a different search engine with: /engine {alt_engine}"
         )
     
+def page_callback(update: Update, context: CallbackContext) -> None:
+    """Handle the prev/next buttons under paged results."""
+    # Paging may fetch more engine pages, so it runs on the search lanes like any search
+    with tracer.begin("page", data=update.callback_query.data):
+        try:
+            search_lane(update.effective_user.id).submit(run_page, update)
+        except queue.Full:
+            update.callback_query.answer("The search queue is full. Please try again in a minute.")
+
+def run_page(update: Update) -> None:
+    """Show the requested page of a result session."""
+    query = update.callback_query
+    _, session_id, number = query.data.split(':')
+    number = int(number)
+
+    pager = find_pager(session_id)
+    if pager is None:
+        query.answer("This search has expired. Please run /dork again.", show_alert=True)
+        return
+    if query.from_user.id != pager.user_id:
+        query.answer("Only the user who ran this search can page through it.")
+        return
+
+    query.answer()
+    with tracer.span("search"):
+        results, has_next = pager.get_page(number)
+    save_pager(pager)
+    with tracer.span("send"):
+        if not results:
+            query.edit_message_reply_markup(reply_markup=page_markup(pager, number - 1, False))
+            return
+        query.edit_message_text(format_page(pager, number, results), reply_markup=page_markup(pager, number, has_next))
+
+def run_fanout(update: Update, dork_query, engine=ALL_ENGINES) -> None:
+    """Run a queued search on every engine at once and send merged results as they arrive."""
+    state = {"message": None, "text": None}
+    engines = supported_engines(dork_query)
+
+    def on_update(merged, counts, done):
+        # Hold the first reply until one engine has enough hits or every engine is done
+        if state["message"] is None and not done and max(counts.values()) < FANOUT_MIN_RESULTS:
+            return
+        if not merged and not done:
+            return
+
+        summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+        pending = len(engines) - len(counts)
+        footer = f"\n{summary}" + (f"\nWaiting for {pending} more engine(s)..." if pending else "")
+        if merged:
+            text = format_results(dork_query, engine, merged[:DISPLAY_LIMIT], footer)
+        else:
+            text = (
+                f"No results found for: {dork_query} on any engine.\n"
+                f"The search engines might be blocking the request."
+            )
+
+        try:
+            with tracer.span("send", engines=len(counts)):
+                if state["message"] is None:
+                    state["message"] = update.message.reply_text(text)
+                elif text != state["text"]:
+                    state["message"].edit_text(text)
+            state["text"] = text
+        except Exception as e:
+            logger.error(f"Error sending fan-out results: {str(e)}")
+
+    search_all_engines(dork_query, on_update)
+    
+def read_queries(path, limit=BATCH_MAX_QUERIES):
+    """Yield non-empty, non-comment lines from a query file without loading it whole."""
+    count = 0
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            query = line.strip()
+            if not query or query.startswith('#'):
+                continue
+            yield query
+            count += 1
+            if count >= limit:
+                break
+
+class BatchWriter:
+    """Write batch results to a CSV or JSONL file as they arrive."""
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        if fmt == 'csv':
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(['query', 'engine', 'rank', 'title', 'link'])
+
+    def write(self, query, engine, rank, result):
+        if self.fmt == 'csv':
+            self._csv.writerow([query, engine, rank, result['title'], result['link']])
+        else:
+            self._file.write(json.dumps({
+                'query': query,
+                'engine': engine,
+                'rank': rank,
+                'title': result['title'],
+                'link': result['link']
+            }) + '\n')
+
+    def close(self):
+        self._file.close()
+
+class BatchBudget:
+    """Per-engine outbound search budget for one batch; cache hits are free."""
+
+    def __init__(self, engines, budget=BATCH_ENGINE_BUDGET):
+        self.remaining = {engine: budget for engine in engines}
+        self._lock = threading.Lock()
+
+    def take(self, engine, query):
+        """Return True if the engine may be searched for this query."""
+        if result_cache.contains(engine, query):
+            return True
+        with self._lock:
+            if self.remaining[engine] <= 0:
+                return False
+            self.remaining[engine] -= 1
+            return True
+
+def batch_search(query, engines, budget):
+    """Search one batch query on each engine; returns (merged results, engines skipped for budget)."""
+    merged = []
+    seen = set()
+    skipped = 0
+    for engine in supported_engines(query, engines):
+        if not budget.take(engine, query):
+            skipped += 1
+            continue
+        merge_results(merged, seen, engine, run_search(query, engine))
+    return merged, skipped
+
+@admin_required
+def batch(update: Update, context: CallbackContext) -> None:
+    """Handle /batch: search every query in an uploaded text file and send back one results file."""
+    message = update.message
+    document = message.document or (message.reply_to_message.document if message.reply_to_message else None)
+    if document is None:
+        message.reply_text(
+            "Send a text file with one dork per line and /batch as its caption, "
+            "or reply /batch to such a file.\n"
+            "Add jsonl for JSON Lines output instead of CSV: /batch jsonl"
+        )
+        return
+
+    args = (message.caption or message.text or '').split()[1:]
+    fmt = 'jsonl' if 'jsonl' in [a.lower() for a in args] else 'csv'
+    user_id = update.effective_user.id
+    lane = search_lane(user_id)
+    engine = get_engine_preference(context, user_id)
+
+    try:
+        position = lane.submit(run_batch, update, document, engine, fmt)
+    except queue.Full:
+        message.reply_text("The search queue is full. Please try again in a minute.")
+        return
+    message.reply_text(f"Batch queued (position {position}). Using engine: {engine}")
+
+def run_batch(update: Update, document, engine, fmt) -> None:
+    """Run a queued batch as a streaming pipeline and send the results file."""
+    user_id = update.effective_user.id
+    engines = [e["name"] for e in SEARCH_ENGINES] if engine == ALL_ENGINES else [get_engine(engine)["name"]]
+    budget = BatchBudget(engines)
+    workdir = tempfile.mkdtemp(prefix="dorker-batch-")
+    input_path = os.path.join(workdir, "queries.txt")
+    output_path = os.path.join(workdir, f"results.{fmt}")
+    stats = {"queries": 0, "results": 0, "skipped": 0}
+    progress = update.message.reply_text("Batch started...")
+    last_progress = time.monotonic()
+    stopped = None
+    writer = None
+
+    try:
+        document.get_file().download(custom_path=input_path)
+        writer = BatchWriter(output_path, fmt)
+        pending = {}
+        queries = read_queries(input_path)
+
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="batch") as pool:
+            while True:
+                # Keep a bounded window of searches in flight so memory stays flat
+                while len(pending) < BATCH_CONCURRENCY * 2 and stopped is None:
+                    query = next(queries, None)
+                    if query is None:
+                        break
+                    if not is_admin(user_id) and not check_rate_limit(user_id):
+                        stopped = f"Rate limit reached; try the rest in {get_remaining_time(user_id)}."
+                        break
+                    pending[pool.submit(batch_search, query, engines, budget)] = query
+                if not pending:
+                    break
+
+                done = next(as_completed(pending))
+                query = pending.pop(done)
+                try:
+                    results, skipped = done.result()
+                except Exception as e:
+                    logger.error(f"Batch query failed: {str(e)}")
+                    results, skipped = [], 0
+                for rank, result in enumerate(results, 1):
+                    writer.write(query, result['engine'], rank, result)
+                stats["queries"] += 1
+                stats["results"] += len(results)
+                stats["skipped"] += skipped
+
+                if time.monotonic() - last_progress >= BATCH_PROGRESS_INTERVAL:
+                    last_progress = time.monotonic()
+                    try:
+                        progress.edit_text(
+                            f"Batch running: {stats['queries']} queries done, {stats['results']} results, "
+                            f"{stats['skipped']} engine searches skipped (budget)"
+                        )
+                    except Exception as e:
+                        logger.debug(f"Error updating batch progress: {str(e)}")
+        writer.close()
+        writer = None
+
+        summary = (
+            f"Batch finished: {stats['queries']} queries, {stats['results']} results, "
+            f"{stats['skipped']} engine searches skipped (budget)"
+        )
+        if stopped:
+            summary += f"\n{stopped}"
+        progress.edit_text(summary)
+        with open(output_path, 'rb') as f:
+            update.message.reply_document(f, filename=f"dork-results.{fmt}")
+    except Exception as e:
+        logger.error(f"Batch failed: {str(e)}")
+        update.message.reply_text(f"Batch failed: {str(e)}")
+    finally:
+        if writer:
+            writer.close()
+        for path in (input_path, output_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(workdir)
+
+def url_hash(url):
+    """Hash a canonicalized URL to a signed 64-bit integer for the seen-URL index."""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+class WatchStore:
+    """Saved dorks and, for each one, a compact index of URL hashes already reported."""
+
+    def __init__(self, db_path=WATCH_DB):
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS watches ("
+                "id INTEGER PRIMARY KEY, chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+                "query TEXT NOT NULL, engine TEXT NOT NULL, hours INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_run REAL)"
+            )
+            # 64-bit hashes in a clustered primary key: ~16 bytes per URL and an index lookup per check
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                "watch_id INTEGER NOT NULL, url_hash INTEGER NOT NULL, "
+                "PRIMARY KEY (watch_id, url_hash)) WITHOUT ROWID"
+            )
+
+    def add(self, chat_id, user_id, query, engine, hours):
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO watches (chat_id, user_id, query, engine, hours, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (chat_id, user_id, query, engine, hours, time.time())
+            )
+            return cursor.lastrowid
+
+    def remove(self, watch_id, user_id):
+        """Delete a watch owned by user_id; returns True if it existed."""
+        with self._lock, self._db:
+            cursor = self._db.execute("DELETE FROM watches WHERE id = ? AND user_id = ?", (watch_id, user_id))
+            if cursor.rowcount:
+                self._db.execute("DELETE FROM seen WHERE watch_id = ?", (watch_id,))
+            return cursor.rowcount > 0
+
+    def get(self, watch_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, chat_id, user_id, query, engine, hours, created_at, last_run FROM watches WHERE id = ?",
+                (watch_id,)
+            ).fetchone()
+        keys = ("id", "chat_id", "user_id", "query", "engine", "hours", "created_at", "last_run")
+        return dict(zip(keys, row)) if row else None
+
+    def list(self, user_id=None):
+        sql = "SELECT id, chat_id, user_id, query, engine, hours, created_at, last_run FROM watches"
+        params = ()
+        if user_id is not None:
+            sql += " WHERE user_id = ?"
+            params = (user_id,)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY id", params).fetchall()
+        keys = ("id", "chat_id", "user_id", "query", "engine", "hours", "created_at", "last_run")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def seen_count(self, watch_id):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen WHERE watch_id = ?", (watch_id,)).fetchone()[0]
+
+    def filter_new(self, watch_id, results):
+        """Return results whose URLs were not seen before, and mark them all as seen."""
+        hashes = {}
+        for result in results:
+            hashes.setdefault(url_hash(result['link']), result)
+        if not hashes:
+            # Still a completed run, so a restart does not treat the watch as overdue
+            with self._lock, self._db:
+                self._db.execute("UPDATE watches SET last_run = ? WHERE id = ?", (time.time(), watch_id))
+            return []
+        with self._lock, self._db:
+            known = set()
+            keys = list(hashes)
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                known.update(row[0] for row in self._db.execute(
+                    f"SELECT url_hash FROM seen WHERE watch_id = ? AND url_hash IN ({','.join('?' * len(chunk))})",
+                    [watch_id] + chunk
+                ))
+            new = [h for h in keys if h not in known]
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen (watch_id, url_hash) VALUES (?, ?)", [(watch_id, h) for h in new]
+            )
+            self._db.execute("UPDATE watches SET last_run = ? WHERE id = ?", (time.time(), watch_id))
+        return [hashes[h] for h in new]
+
+watch_store = None
+
+def get_watch_store():
+    """Open the watch database on first use."""
+    global watch_store
+    if watch_store is None:
+        watch_store = WatchStore()
+    return watch_store
+
+def schedule_watch(job_queue, watch):
+    """Run a watch every `hours` hours on the bot's job queue, counting from its last run."""
+    interval = watch["hours"] * 3600
+    # After a restart, resume the existing cycle instead of waiting a full interval again
+    first = max(0, (watch["last_run"] or watch["created_at"]) + interval - time.time())
+    job_queue.run_repeating(watch_job, interval=interval, first=first, context=watch["id"], name=f"watch-{watch['id']}")
+
+def watch_job(context: CallbackContext) -> None:
+    """Job queue callback: hand the watch run to the search lanes so the scheduler never blocks."""
+    watch = get_watch_store().get(context.job.context)
+    if watch is None:
+        context.job.schedule_removal()
+        return
+    lane = admin_lane if is_admin(watch["user_id"]) else user_lane
+    try:
+        lane.submit(run_watch, context.bot, watch)
+    except queue.Full:
+        logger.warning(f"Search queue full, skipping this run of watch {watch['id']}")
+
+def run_watch(bot, watch) -> int:
+    """Run a saved dork and push only results not reported before; returns the number of new hits."""
+    engines = supported_engines(watch["query"]) if watch["engine"] == ALL_ENGINES else [watch["engine"]]
+    results = []
+    seen = set()
+    for engine in engines:
+        merge_results(results, seen, engine if len(engines) > 1 else None, run_search(watch["query"], engine, fresh=True))
+
+    new = get_watch_store().filter_new(watch["id"], results)
+    if new:
+        footer = f"\n{len(new) - DISPLAY_LIMIT} more new results not shown." if len(new) > DISPLAY_LIMIT else ""
+        text = format_results(watch["query"], watch["engine"], new[:DISPLAY_LIMIT], footer)
+        try:
+            bot.send_message(chat_id=watch["chat_id"], text=f"New results for watch #{watch['id']}\n\n{text}")
+        except Exception as e:
+            logger.error(f"Error sending watch results: {str(e)}")
+    return len(new)
+
+@admin_required
+def watch(update: Update, context: CallbackContext) -> None:
+    """Handle /watch add|list|remove for saved dorks."""
+    args = list(context.args)
+    action = args.pop(0).lower() if args else ""
+    user_id = update.effective_user.id
+    store = get_watch_store()
+
+    if action == "add":
+        hours = WATCH_DEFAULT_HOURS
+        if args and re.fullmatch(r'\d+h', args[0].lower()):
+            hours = max(WATCH_MIN_HOURS, int(args.pop(0)[:-1]))
+        if not args:
+            update.message.reply_text("Please provide a dork query. Example: /watch add 24h site:example.com filetype:sql")
+            return
+        if len(store.list(user_id)) >= WATCH_MAX_PER_USER:
+            update.message.reply_text(f"You already have {WATCH_MAX_PER_USER} watches. Remove one first.")
+            return
+        engine = get_engine_preference(context, user_id)
+        query = ' '.join(args)
+        reason = unsupported_reason(query, engine)
+        if reason:
+            update.message.reply_text(reason)
+            return
+        watch_id = store.add(update.effective_chat.id, user_id, query, engine, hours)
+        new_watch = store.get(watch_id)
+        schedule_watch(context.job_queue, new_watch)
+
+        # Index what is already out there so later runs only report new hits
+        lane = admin_lane if is_admin(user_id) else user_lane
+        try:
+            lane.submit(run_watch, context.bot, new_watch)
+            first_run = "Current results are sent now; after that you will only get new ones."
+        except queue.Full:
+            first_run = (
+                f"The search queue is full, so current results will come with the first scheduled run "
+                f"in {hours}h; after that you will only get new ones."
+            )
+        update.message.reply_text(f"Watch #{watch_id} saved: {query} ({engine}, every {hours}h).\n{first_run}")
+    elif action == "list":
+        watches = store.list(user_id)
+        if not watches:
+            update.message.reply_text("You have no watches. Add one with: /watch add [24h] <query>")
+            return
+        lines = [
+            f"#{w['id']}: {w['query']} ({w['engine']}, every {w['hours']}h, {store.seen_count(w['id'])} URLs seen)"
+            for w in watches
+        ]
+        update.message.reply_text("Your watches:\n\n" + "\n".join(lines))
+    elif action == "remove" and args and args[0].isdigit():
+        watch_id = int(args[0])
+        if store.remove(watch_id, user_id):
+            for job in context.job_queue.get_jobs_by_name(f"watch-{watch_id}"):
+                job.schedule_removal()
+            update.message.reply_text(f"Watch #{watch_id} removed.")
+        else:
+            update.message.reply_text(f"No watch #{watch_id} found.")
+    else:
+        update.message.reply_text(
+            "Usage:\n"
+            "/watch add [24h] <query> - Run a dork on a schedule and get only new results\n"
+            "/watch list - Show your watches\n"
+            "/watch remove <id> - Delete a watch"
+        )
+
 def set_admin(update: Update, context: CallbackContext) -> None:
     """Set the admin ID."""
     # Only allow setting admin if no admin is set yet or if the current user is admin
@@ -483,56 +3384,46 @@ def whoami(update: Update, context: CallbackContext) -> None:
     
 def set_engine(update: Update, context: CallbackContext) -> None:
     """Set the preferred search engine."""
+    valid_engines = [e["name"] for e in SEARCH_ENGINES]
+
     if not context.args:
         update.message.reply_text(
             "Please specify a search engine. Available options:\n"
-            "- Google\n"
-            "- Bing\n"
-            "- DuckDuckGo\n\n"
-            "Example: /engine Bing"
+            + "".join(f"- {name}\n" for name in valid_engines)
+            + f"- {ALL_ENGINES} (search every engine at once)\n"
+            + f"\nExample: /engine {valid_engines[1 % len(valid_engines)]}"
         )
         return
         
-    engine = context.args[0].capitalize()
-    valid_engines = ["Google", "Bing", "DuckDuckGo"]
+    spec = find_engine(context.args[0])
         
-    if engine not in valid_engines:
+    if context.args[0].lower() == ALL_ENGINES.lower():
+        engine = ALL_ENGINES
+    elif spec is None:
         update.message.reply_text(
-            f"Invalid search engine. Available options: {', '.join(valid_engines)}"
+            f"Invalid search engine. Available options: {', '.join(valid_engines + [ALL_ENGINES])}"
         )
         return
+    else:
+        engine = spec["name"]
         
     # Store the preferred engine in user data
-    if not context.user_data:
-        context.user_data = {}
-    context.user_data['search_engine'] = engine
+    set_engine_preference(context, update.effective_user.id, engine)
         
     update.message.reply_text(f"Search engine set to: {engine}")
     
 def get_remaining_time(user_id):
     """Get the remaining time until rate limit reset."""
-    user_id_str = str(user_id)
-    if user_id_str not in rate_limit_data:
-        return "0 minutes"
-        
-    user_data = rate_limit_data[user_id_str]
-    timestamp = datetime.fromisoformat(user_data["timestamp"])
-    now = datetime.now()
-        
-    # Calculate time until reset (1 hour from the first request)
-    reset_time = timestamp + timedelta(hours=1)
-    remaining = reset_time - now
-        
-    if remaining.total_seconds() <= 0:
+    _, seconds = rate_limiter.usage(user_id)
+    if seconds <= 0:
         return "0 minutes"
         
-    minutes = int(remaining.total_seconds() / 60)
+    minutes = int(seconds / 60)
     return f"{minutes} minutes"
     
 def status(update: Update, context: CallbackContext) -> None:
     """Show bot status and rate limits."""
     user_id = update.effective_user.id
-    user_id_str = str(user_id)
         
     is_admin_user = is_admin(user_id)
     admin_status = "You are the admin of this bot." if is_admin_user else "You are not an admin of this bot."
@@ -542,15 +3433,17 @@ def status(update: Update, context: CallbackContext) -> None:
     remaining = RATE_LIMIT
     time_remaining = "N/A"
         
-    if user_id_str in rate_limit_data:
-        user_data = rate_limit_data[user_id_str]
-        searches_used = user_data["count"]
+    count, _ = rate_limiter.usage(user_id)
+    if count:
+        searches_used = count
         remaining = max(0, RATE_LIMIT - searches_used)
         time_remaining = get_remaining_time(user_id)
         
     # Get preferred search engine
-    engine = context.user_data.get('search_engine', 'Google') if context.user_data else 'Google'
+    engine = get_engine_preference(context, user_id)
         
+    cache = result_cache.stats()
+
     update.message.reply_text(
         f"Bot Status:\n\n"
         f"Your ID: {user_id}\n"
@@ -559,35 +3452,356 @@ def status(update: Update, context: CallbackContext) -> None:
         f"Searches used: {searches_used}\n"
         f"Searches remaining: {remaining if not is_admin_user else 'Unlimited'}\n"
         f"Time until reset: {time_remaining if not is_admin_user else 'N/A'}\n\n"
-        f"Current search engine: {engine}"
+        f"Current search engine: {engine}\n\n"
+        f"Result cache: {cache['hits']} hits, {cache['misses']} misses ({cache['size']} entries)"
     )
+
+    if is_admin_user:
+        pool = browser_pool.stats()
+        update.message.reply_text(
+            f"Browser Pool:\n\n"
+            f"Size: {browser_pool.size} (live: {pool['live']}, idle: {pool['idle']})\n"
+            f"Leases: {pool['leases']}, launches: {pool['launches']}\n"
+            f"Recycled: {pool['recycled']}, discarded: {pool['discarded']}\n"
+            f"Lease wait: avg {pool['wait_avg']:.2f}s, max {pool['wait_max']:.2f}s\n"
+            f"Lease time: avg {pool['lease_avg']:.2f}s, max {pool['lease_max']:.2f}s"
+        )
+
+        lanes = []
+        for lane in active_lanes():
+            lane_stats = lane.stats()
+            lanes.append(
+                f"{lane.name.capitalize()} lane: {lane_stats['depth']} queued, {lane_stats['running']} running, "
+                f"{lane_stats['rejected']} rejected\n"
+                f"Queue wait: avg {lane_stats['wait_avg']:.2f}s, max {lane_stats['wait_max']:.2f}s"
+            )
+        update.message.reply_text("Search Queue:\n\n" + "\n\n".join(lanes))
     
-def main() -> None:
-    """Start the bot."""
-    # Load rate limit data
-    load_rate_limit_data()
-        
+@admin_required
+def metrics_command(update: Update, context: CallbackContext) -> None:
+    """Summarize search metrics for the admin."""
+    lines = ["Search latency (count, avg, ~p50, ~p95):"]
+    for labels, (count, mean, p50, p95) in sorted(metrics.summary("dorker_search_seconds").items()):
+        labels = dict(labels)
+        lines.append(f"- {labels['engine']}/{labels['method']}: {count}, {mean:.2f}s, {p50}s, {p95}s")
+
+    lines.append("\nParse time (count, avg):")
+    for labels, (count, mean, _, _) in sorted(metrics.summary("dorker_parse_seconds").items()):
+        lines.append(f"- {dict(labels)['engine']}: {count}, {mean * 1000:.1f} ms")
+
+    lines.append("\nResults per search (avg):")
+    for labels, (count, mean, _, _) in sorted(metrics.summary("dorker_search_results").items()):
+        labels = dict(labels)
+        lines.append(f"- {labels['engine']}/{labels['method']}: {mean:.1f}")
+
+    fallbacks = metrics.counters("dorker_selenium_fallbacks_total")
+    lines.append("\nSelenium fallbacks: " + (
+        ", ".join(f"{dict(k)['engine']}: {v}" for k, v in sorted(fallbacks.items())) or "none"
+    ))
+    if HEDGE_SELENIUM:
+        wins = metrics.counters("dorker_hedge_wins_total")
+        lines.append(
+            f"Hedged searches: {sum(metrics.counters('dorker_hedges_total').values())} (won by " + (
+                ", ".join(f"{dict(k)['engine']}/{dict(k)['method']}: {v}" for k, v in sorted(wins.items())) or "none"
+            ) + ")"
+        )
+    statuses = metrics.counters("dorker_http_status_total")
+    lines.append("Non-200 responses: " + (
+        ", ".join(f"{dict(k)['engine']} {dict(k)['code']}: {v}" for k, v in sorted(statuses.items())) or "none"
+    ))
+    errors = metrics.counters("dorker_search_errors_total")
+    lines.append("Errors: " + (
+        ", ".join(f"{dict(k)['engine']}/{dict(k)['method']}: {v}" for k, v in sorted(errors.items())) or "none"
+    ))
+    lines.append("\nEngine health (state, EWMA latency, success rate, timeout):")
+    for (engine, method), health in sorted(engine_health.snapshot().items()):
+        latency = f"{health['latency']:.2f}s" if health['latency'] is not None else "-"
+        lines.append(
+            f"- {engine}/{method}: {health['state']}, {latency}, {health['success_rate']:.0%}, "
+            f"{engine_health.timeout(engine, method):.1f}s"
+        )
+    rejections = sum(metrics.counters("dorker_rate_limit_rejections_total").values())
+    lines.append(f"Rate limit rejections: {rejections}")
+    lines.append(
+        "Queue depth: " + ", ".join(f"{lane.name} {lane.stats()['depth']}" for lane in active_lanes())
+    )
+    if METRICS_PORT:
+        lines.append(f"\nPrometheus endpoint: http://127.0.0.1:{METRICS_PORT}/metrics")
+
+    update.message.reply_text("\n".join(lines)[:MESSAGE_LIMIT])
+
+@admin_required
+def traces_command(update: Update, context: CallbackContext) -> None:
+    """Show the slowest recent searches stage by stage."""
+    count = int(context.args[0]) if context.args and context.args[0].isdigit() else 5
+    traces = tracer.slowest(max(1, min(count, 50)))
+    if not traces:
+        update.message.reply_text("No searches traced yet.")
+        return
+
+    text = f"Slowest of the last {TRACE_BUFFER_SIZE} searches:\n\n" + "\n\n".join(trace.format() for trace in traces)
+    if len(text) > MESSAGE_LIMIT:
+        update.message.reply_document(io.BytesIO(text.encode('utf-8')), filename="traces.txt")
+    else:
+        update.message.reply_text(text)
+
+@admin_required
+def profile_command(update: Update, context: CallbackContext) -> None:
+    """Sample the stacks of the next N searches and send the hottest functions."""
+    searches = int(context.args[0]) if context.args and context.args[0].isdigit() else 10
+    chat_id = update.effective_chat.id
+    bot = context.bot
+
+    def deliver(report):
+        summary, collapsed = report
+        bot.send_message(chat_id, summary[:MESSAGE_LIMIT])
+        if collapsed:
+            # Collapsed stacks load straight into flamegraph.pl or speedscope
+            bot.send_document(chat_id, io.BytesIO(collapsed.encode('utf-8')), filename="profile.folded")
+
+    if not profiler.start(searches, deliver):
+        update.message.reply_text("A profile is already running.")
+        return
+    update.message.reply_text(
+        f"Profiling the next {searches} searches (one sample every {PROFILE_INTERVAL * 1000:.0f} ms)..."
+    )
+    
+def build_updater(token=None, base_url=None, workers=None):
+    """Create the Updater and register every handler on its dispatcher."""
+    from telegram.ext import Updater, CommandHandler, CallbackQueryHandler, MessageHandler, Filters
+
     # Create the Updater and pass it your bot's token
-    updater = Updater(TELEGRAM_BOT_TOKEN)
+    updater = Updater(
+        token or TELEGRAM_BOT_TOKEN,
+        base_url=base_url or TELEGRAM_API_URL,
+        workers=workers or BOT_WORKERS
+    )
         
     # Get the dispatcher to register handlers
     dispatcher = updater.dispatcher
         
-    # Register command handlers
-    dispatcher.add_handler(CommandHandler("start", start))
-    dispatcher.add_handler(CommandHandler("help", help_command))
-    dispatcher.add_handler(CommandHandler("dork", dork))
-    dispatcher.add_handler(CommandHandler("setadmin", set_admin))
-    dispatcher.add_handler(CommandHandler("whoami", whoami))
-    dispatcher.add_handler(CommandHandler("engine", set_engine))
-    dispatcher.add_handler(CommandHandler("status", status))
+    # Register command handlers; they run on the worker pool so one slow handler does not hold up the rest
+    dispatcher.add_handler(CommandHandler("start", start, run_async=True))
+    dispatcher.add_handler(CommandHandler("help", help_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("dork", dork, run_async=True))
+    dispatcher.add_handler(CommandHandler("setadmin", set_admin, run_async=True))
+    dispatcher.add_handler(CommandHandler("whoami", whoami, run_async=True))
+    dispatcher.add_handler(CommandHandler("engine", set_engine, run_async=True))
+    dispatcher.add_handler(CommandHandler("status", status, run_async=True))
+    dispatcher.add_handler(CommandHandler("batch", batch, run_async=True))
+    dispatcher.add_handler(CommandHandler("metrics", metrics_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("watch", watch, run_async=True))
+    dispatcher.add_handler(CommandHandler("traces", traces_command, run_async=True))
+    dispatcher.add_handler(CommandHandler("profile", profile_command, run_async=True))
+    dispatcher.add_handler(
+        MessageHandler(Filters.document & Filters.caption_regex(r'^/batch\b'), batch, run_async=True)
+    )
+    dispatcher.add_handler(CallbackQueryHandler(page_callback, pattern=r'^page:', run_async=True))
+
+    # Release idle result sessions
+    updater.job_queue.run_repeating(sweep_pager_sessions, interval=60)
+
+    # Reschedule saved dorks
+    for saved in get_watch_store().list():
+        schedule_watch(updater.job_queue, saved)
+    return updater
+
+def start_intake(updater, mode=None):
+    """Start receiving updates by long polling or through the webhook receiver."""
+    mode = mode or BOT_MODE
+    if mode == 'webhook':
+        # Without it the receiver would register https://<listen>:<port>/..., which Telegram rejects
+        if not WEBHOOK_URL:
+            raise ValueError("BOT_MODE=webhook needs WEBHOOK_URL")
+        url_path = WEBHOOK_PATH or updater.bot.token
+        # The built-in receiver decodes each update, queues it for the dispatcher and acknowledges at once
+        updater.start_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=url_path,
+            webhook_url=WEBHOOK_URL,
+            max_connections=WEBHOOK_MAX_CONNECTIONS
+        )
+        logger.info(f"Receiving updates by webhook on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}")
+    elif mode == 'polling':
+        updater.start_polling()
+        logger.info("Receiving updates by long polling")
+    else:
+        raise ValueError(f"Unknown BOT_MODE: {mode}")
+
+def run_worker() -> None:
+    """Serve searches queued by an intake process until interrupted."""
+    from telegram import Bot
+    from telegram.utils.request import Request
+
+    # One Bot API connection per worker thread, plus a few for prefetch and fan-out replies
+    request = Request(con_pool_size=SEARCH_WORKERS + ADMIN_SEARCH_WORKERS + 4)
+    bot = Bot(TELEGRAM_BOT_TOKEN, base_url=TELEGRAM_API_URL, request=request)
+    shared_user_lane.start(bot)
+    shared_admin_lane.start(bot)
+    logger.info("Dorker worker is running...")
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop.set())
+    try:
+        while not stop.wait(1):
+            pass
+    finally:
+        shared_user_lane.stop()
+        shared_admin_lane.stop()
+
+def _replay_page(root, engine, digest, codec):
+    """Re-extract one archived page in a replay worker; None if it cannot be read."""
+    try:
+        return extract_results(engine, SerpArchive.load(root, digest, codec))
+    except Exception as e:
+        logger.error(f"Error replaying archived page {digest}: {str(e)}")
+        return None
+
+def replay_archive(archive, rows, workers=None):
+    """Run the current extractors over archived pages across processes; returns {(engine, digest): results}."""
+    # Imported here so multiprocessing is only loaded by replays
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Identical pages parse identically, so each stored page is parsed once per engine
+    pages = sorted({(row["engine"], row["digest"], row["codec"]) for row in rows})
+    if not pages:
+        return {}
+    engines, digests, codecs = zip(*pages)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        extracted = pool.map(
+            _replay_page, [archive.root] * len(pages), engines, digests, codecs,
+            chunksize=max(1, len(pages) // (workers * 4))
+        )
+        return {(engine, digest): results for engine, digest, results in zip(engines, digests, extracted)}
+
+def replay_main(argv):
+    """Re-parse archived result pages with the current extractors: python dorker.py --replay [options]."""
+    parser = argparse.ArgumentParser(
+        prog="dorker.py --replay",
+        description="Re-run result extraction over the SERP archive instead of searching again."
+    )
+    parser.add_argument("--dir", default=SERP_ARCHIVE_DIR, help="archive directory (default: SERP_ARCHIVE_DIR)")
+    parser.add_argument("--engine", help="only pages fetched from this engine")
+    parser.add_argument("--query", help="only pages fetched for this exact query")
+    parser.add_argument("--since", help="only pages fetched at or after this ISO date/time")
+    parser.add_argument("--until", help="only pages fetched before this ISO date/time")
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    parser.add_argument("--output", help="write the re-extracted results of every fetch to this JSONL file")
+    args = parser.parse_args(argv)
+
+    if not args.dir:
+        parser.error("set SERP_ARCHIVE_DIR or pass --dir")
+    if not os.path.exists(os.path.join(args.dir, "index.db")):
+        parser.error(f"no SERP archive in {args.dir}")
+    engine = None
+    if args.engine:
+        spec = find_engine(args.engine)
+        if spec is None:
+            parser.error(f"unknown engine: {args.engine}")
+        engine = spec["name"]
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    until = datetime.fromisoformat(args.until).timestamp() if args.until else None
+
+    archive = SerpArchive(args.dir)
+    rows = archive.find(engine=engine, query=args.query, since=since, until=until)
+    started = time.monotonic()
+    extracted = replay_archive(archive, rows, args.workers)
+    elapsed = time.monotonic() - started
+
+    stats = archive.stats()
+    print(
+        f"Archive: {stats['pages']} fetches stored as {stats['objects']} pages, "
+        f"{stats['bytes'] / 2 ** 20:.1f} MiB compressed to {stats['stored_bytes'] / 2 ** 20:.1f} MiB"
+    )
+    print(f"Replayed {len(rows)} fetches ({len(extracted)} distinct pages) in {elapsed:.1f}s\n")
+
+    # Per engine: fetches, with results when fetched, with results now, recovered, lost, changed, unreadable
+    summary = {}
+    for row in rows:
+        results = extracted[(row["engine"], row["digest"])]
+        counts = summary.setdefault(row["engine"], Counter())
+        counts["fetches"] += 1
+        if results is None:
+            counts["unreadable"] += 1
+            continue
+        counts["before"] += bool(row["results"])
+        counts["after"] += bool(results)
+        counts["recovered"] += not row["results"] and bool(results)
+        counts["lost"] += bool(row["results"]) and not results
+        counts["changed"] += len(results) != row["results"]
+
+    columns = ("fetches", "before", "after", "recovered", "lost", "changed", "unreadable")
+    print(f"{'engine':<12}" + "".join(f"{column:>11}" for column in columns))
+    for name, counts in sorted(summary.items()):
+        print(f"{name:<12}" + "".join(f"{counts[column]:>11}" for column in columns))
+    print("\nbefore/after: fetches that yielded results when archived / with the current extractors")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for row in rows:
+                record = {key: row[key] for key in ("engine", "query", "page", "url", "method", "fetched_at", "digest")}
+                record["archived_results"] = row["results"]
+                record["results"] = extracted[(row["engine"], row["digest"])]
+                f.write(json.dumps(record) + "\n")
+        print(f"Results written to {args.output}")
+    return 0
+
+def main() -> None:
+    """Start the bot."""
+    if BOT_ROLE not in ('all', 'intake', 'worker'):
+        raise ValueError(f"Unknown BOT_ROLE: {BOT_ROLE}")
+
+    # Share rate limits, cached results and preferences with the other processes
+    store = get_shared_store()
+    if store is not None:
+        rate_limiter.store = store
+        result_cache.store = store
+    elif BOT_ROLE != 'all':
+        raise ValueError(f"BOT_ROLE={BOT_ROLE} needs SHARED_STORE")
+
+    # Warm the user agent data without delaying startup
+    user_agents.preload()
+
+    # Load rate limit data and start periodic persistence
+    rate_limiter.start()
+
+    # Start the search workers
+    user_lane.start()
+    admin_lane.start()
+
+    # Expose Prometheus metrics on localhost if configured
+    metrics_server = start_metrics_server()
+
+    try:
+        if BOT_ROLE == 'worker':
+            run_worker()
+            return
+
+        updater = build_updater()
         
-    # Start the Bot
-    updater.start_polling()
-    logger.info("Dorker bot is running...")
+        # Start the Bot
+        start_intake(updater)
+        logger.info("Dorker bot is running...")
         
-    # Run the bot until you press Ctrl-C
-    updater.idle()
+        # Run the bot until you press Ctrl-C
+        updater.idle()
+    finally:
+        if metrics_server:
+            metrics_server.shutdown()
+        user_lane.stop()
+        admin_lane.stop()
+        fanout_executor.shutdown(wait=False)
+        browser_pool.shutdown()
+        search_client.close()
+        async_core.close()
+        rate_limiter.stop()
+        # Finish writing pages still queued for the SERP archive
+        archive_executor.shutdown(wait=True)
     
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['--replay']:
+        sys.exit(replay_main(sys.argv[2:]))
     main()